@@ -0,0 +1,11 @@
+docker compose exec posts-service python -m benchmarks.list_posts
+docker compose exec posts-service python -m benchmarks.bulk_create
+docker compose exec posts-service python -m benchmarks.server_modes
+docker compose exec posts-service python -m benchmarks.explain_indexes
+docker compose exec posts-service python -m benchmarks.search_posts
+docker compose exec posts-service python -m benchmarks.wire_format
+docker compose exec posts-service python -m benchmarks.kafka_producer
+docker compose exec posts-service python -m benchmarks.event_format
+docker compose exec stats-service python -m benchmarks.ingest
+docker compose exec stats-service python -m benchmarks.rollups
+docker compose exec stats-service python -m benchmarks.top
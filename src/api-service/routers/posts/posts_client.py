@@ -1,4 +1,5 @@
 import grpc
+from google.protobuf import field_mask_pb2
 import posts_service_pb2
 import posts_service_pb2_grpc
 
@@ -41,21 +42,58 @@ class PostsServiceClient:
         )
         return self.stub.UpdatePost(request)
 
-    def get_post(self, post_id, user_id):
+    def get_post(self, post_id, user_id, fields=None):
         request = posts_service_pb2.GetPostRequest(
             id=post_id,
-            user_id=user_id
+            user_id=user_id,
+            fields=field_mask_pb2.FieldMask(paths=fields or [])
         )
         return self.stub.GetPost(request)
 
-    def list_posts(self, page, page_size, user_id=None):
+    def batch_get_posts(self, post_ids, user_id):
+        request = posts_service_pb2.BatchGetPostsRequest(
+            ids=post_ids,
+            user_id=user_id
+        )
+        return self.stub.BatchGetPosts(request)
+
+    def stream_posts(self, user_id, chunk_size=None):
+        request = posts_service_pb2.StreamPostsRequest(
+            user_id=user_id,
+            chunk_size=chunk_size
+        )
+        return self.stub.StreamPosts(request)
+
+    def list_posts(self, page, page_size, user_id=None, cursor=None, fields=None):
         request = posts_service_pb2.ListPostsRequest(
             page=page,
             page_size=page_size,
-            user_id=user_id
+            user_id=user_id,
+            cursor=cursor,
+            fields=field_mask_pb2.FieldMask(paths=fields or [])
         )
         return self.stub.ListPosts(request)
 
+    def list_posts_by_tag(self, tags, match_all, page, page_size, user_id=None, cursor=None):
+        request = posts_service_pb2.ListPostsByTagRequest(
+            tags=tags,
+            match_all=match_all,
+            page=page,
+            page_size=page_size,
+            user_id=user_id,
+            cursor=cursor
+        )
+        return self.stub.ListPostsByTag(request)
+
+    def search_posts(self, query, page_size, user_id=None, cursor=None):
+        request = posts_service_pb2.SearchPostsRequest(
+            query=query,
+            page_size=page_size,
+            user_id=user_id,
+            cursor=cursor
+        )
+        return self.stub.SearchPosts(request)
+
     def comment_post(self, description, post_id, creator_id):
         request = posts_service_pb2.CommentPostRequest(
             description=description,
@@ -64,12 +102,13 @@ class PostsServiceClient:
         )
         return self.stub.CommentPost(request)
 
-    def list_comments(self, page, page_size, user_id, post_id):
+    def list_comments(self, page, page_size, user_id, post_id, cursor=None):
         request = posts_service_pb2.ListCommentsRequest(
             page=page,
             page_size=page_size,
             user_id=user_id,
-            post_id=post_id
+            post_id=post_id,
+            cursor=cursor
         )
         return self.stub.ListComments(request)
 
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Cookie, Depends
+from fastapi import APIRouter, HTTPException, Cookie, Depends, Query
+from fastapi.responses import StreamingResponse
 import httpx
 import grpc
+import posts_service_pb2
 
 from .posts_client import PostsServiceClient
 from .schemas import *
@@ -28,18 +30,53 @@ async def get_current_user_id(token: str = Cookie(None)):
         print(str(e))
         raise HTTPException(status_code=503, detail="User Service unavailable")
 
+def grpc_totals_mode(response):
+    if response.totals_mode == posts_service_pb2.TOTALS_MODE_NONE:
+        return None
+    return posts_service_pb2.TotalsMode.Name(response.totals_mode).removeprefix("TOTALS_MODE_").lower()
+
+def grpc_datetime(value):
+    return datetime.datetime.fromisoformat(value)
+
 def grpc_post_to_response(grpc_post) -> PostResponse:
     return PostResponse(
         id=grpc_post.id,
         title=grpc_post.title,
         description=grpc_post.description,
-        created_at=datetime.datetime.fromisoformat(grpc_post.created_at),
-        updated_at=datetime.datetime.fromisoformat(grpc_post.updated_at),
+        created_at=grpc_datetime(grpc_post.created_at),
+        updated_at=grpc_datetime(grpc_post.updated_at),
         is_private=grpc_post.is_private,
         creator_id=grpc_post.creator_id,
-        tags=list(grpc_post.tags)
+        tags=list(grpc_post.tags),
+        comment_count=grpc_post.comment_count,
+        like_count=grpc_post.like_count
     )
 
+def parse_fields(fields):
+    if not fields:
+        return None
+    fields = list(dict.fromkeys(["id"] + [field.strip() for field in fields.split(",") if field.strip()]))
+    unknown = [field for field in fields if field not in PartialPostResponse.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown post fields: {', '.join(unknown)}")
+    return fields
+
+def grpc_post_to_partial_response(grpc_post, fields) -> PartialPostResponse:
+    values = {}
+    for field in fields:
+        value = getattr(grpc_post, field)
+        if field in ("created_at", "updated_at"):
+            value = grpc_datetime(value)
+        elif field == "tags":
+            value = list(value)
+        values[field] = value
+    return PartialPostResponse(**values)
+
+def grpc_post_to_view(grpc_post, fields):
+    if fields is None:
+        return grpc_post_to_response(grpc_post)
+    return grpc_post_to_partial_response(grpc_post, fields)
+
 @router.post("/", response_model=PostResponse, status_code=201)
 async def create_post(post: PostBase, user_id: int = Depends(get_current_user_id)):
     try:
@@ -94,15 +131,71 @@ async def update_post(post_id: int, post: PostBase, user_id: int = Depends(get_c
             detail=f"gRPC error: {e.details()}"
         )
 
-@router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: int, user_id: int = Depends(get_current_user_id)):
+@router.get("/export")
+async def export_posts(chunk_size: Optional[int] = None, user_id: int = Depends(get_current_user_id)):
+    stream = client.stream_posts(user_id=user_id, chunk_size=chunk_size)
+    try:
+        first = next(stream, None)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.PERMISSION_DENIED:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        elif e.code() == grpc.StatusCode.UNAVAILABLE:
+            raise HTTPException(status_code=503, detail="Posts Service unavailable")
+        raise HTTPException(
+            status_code=500,
+            detail=f"gRPC error: {e.details()}"
+        )
+
+    def generate():
+        if first is None:
+            return
+        yield grpc_post_to_response(first).model_dump_json() + "\n"
+        try:
+            for post in stream:
+                yield grpc_post_to_response(post).model_dump_json() + "\n"
+        except grpc.RpcError as e:
+            # abort the connection so clients can tell the export was cut off
+            print(f"Export interrupted: {e.details()}", flush=True)
+            raise
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=PostsListResponse)
+async def search_posts(
+        q: str,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        user_id: int = Depends(get_current_user_id)
+):
     try:
-        response = client.get_post(post_id=post_id, user_id=user_id)
+        response = client.search_posts(query=q, page_size=page_size, user_id=user_id, cursor=cursor)
+        return PostsListResponse(
+            posts=[grpc_post_to_response(post) for post in response.posts],
+            page_size=response.page_size,
+            next_cursor=response.next_cursor or None
+        )
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        raise HTTPException(
+            status_code=500,
+            detail=f"gRPC error: {e.details()}"
+        )
+
+@router.get("/{post_id}", response_model=Union[PostResponse, PartialPostResponse], response_model_exclude_unset=True)
+async def get_post(post_id: int, fields: Optional[str] = None, user_id: int = Depends(get_current_user_id)):
+    fields = parse_fields(fields)
+    try:
+        response = client.get_post(post_id=post_id, user_id=user_id, fields=fields)
         if not response.post.id:
             raise HTTPException(status_code=404, detail="Post not found")
-        return grpc_post_to_response(response.post)
+        return grpc_post_to_view(response.post, fields)
     except grpc.RpcError as e:
-        if e.code() == grpc.StatusCode.NOT_FOUND:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        elif e.code() == grpc.StatusCode.NOT_FOUND:
             raise HTTPException(status_code=404, detail="Post not found")
         elif e.code() == grpc.StatusCode.PERMISSION_DENIED:
             raise HTTPException(status_code=403, detail="Access denied")
@@ -112,21 +205,68 @@ async def get_post(post_id: int, user_id: int = Depends(get_current_user_id)):
         )
 
 
-@router.get("/", response_model=PostsListResponse)
-async def list_posts(page: int, page_size: int, user_id: int = Depends(get_current_user_id)):
+@router.post("/batch", response_model=BatchPostsResponse)
+async def batch_get_posts(request: BatchPostsRequest, user_id: int = Depends(get_current_user_id)):
     try:
-        response = client.list_posts(
-            page=page,
-            page_size=page_size,
-            user_id=user_id
+        response = client.batch_get_posts(post_ids=request.ids, user_id=user_id)
+        return BatchPostsResponse(items=[
+            BatchPostItem(
+                id=item.id,
+                found=item.found,
+                post=grpc_post_to_response(item.post) if item.found else None
+            ) for item in response.items
+        ])
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        raise HTTPException(
+            status_code=500,
+            detail=f"gRPC error: {e.details()}"
         )
+
+
+@router.get("/", response_model=PostsListResponse, response_model_exclude_unset=True)
+async def list_posts(
+        page: Optional[int] = None,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        tag: Optional[List[str]] = Query(None),
+        tag_mode: str = "any",
+        fields: Optional[str] = None,
+        user_id: int = Depends(get_current_user_id)
+):
+    if tag_mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="tag_mode must be 'any' or 'all'")
+    fields = parse_fields(fields)
+    try:
+        if tag:
+            response = client.list_posts_by_tag(
+                tags=tag,
+                match_all=tag_mode == "all",
+                page=page,
+                page_size=page_size,
+                user_id=user_id,
+                cursor=cursor
+            )
+        else:
+            response = client.list_posts(
+                page=page,
+                page_size=page_size,
+                user_id=user_id,
+                cursor=cursor,
+                fields=fields
+            )
         return PostsListResponse(
-            posts=[grpc_post_to_response(post) for post in response.posts],
-            total=response.total,
-            page=response.page,
-            page_size=response.page_size
+            posts=[grpc_post_to_view(post, fields) for post in response.posts],
+            total=response.total if page else None,
+            page=response.page if page else None,
+            page_size=response.page_size,
+            next_cursor=response.next_cursor or None,
+            totals_mode=grpc_totals_mode(response)
         )
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
         raise HTTPException(
             status_code=500,
             detail=f"gRPC error: {e.details()}"
@@ -136,7 +276,7 @@ def grpc_comment_to_response(grpc_comment) -> CommentResponse:
     return CommentResponse(
         id=grpc_comment.id,
         description=grpc_comment.description,
-        created_at=datetime.datetime.fromisoformat(grpc_comment.created_at),
+        created_at=grpc_datetime(grpc_comment.created_at),
         post_id=grpc_comment.post_id,
         creator_id=grpc_comment.creator_id
     )
@@ -168,19 +308,23 @@ async def create_comment(
 @router.get("/{post_id}/comments", response_model=CommentsListResponse)
 async def list_comments(
         post_id: int,
-        page: int = 1,
+        page: Optional[int] = 1,
         page_size: int = 10,
+        cursor: Optional[str] = None,
         user_id: int = Depends(get_current_user_id)
 ):
+    if cursor:
+        page = None
     try:
         response = client.list_comments(
             post_id=post_id,
             page=page,
             page_size=page_size,
-            user_id=user_id
+            user_id=user_id,
+            cursor=cursor
         )
 
-        if not response.comments and response.total == 0:
+        if page and not response.comments and response.total == 0:
             raise HTTPException(
                 status_code=403,
                 detail="No access to this post or post not found"
@@ -188,9 +332,11 @@ async def list_comments(
 
         return CommentsListResponse(
             comments=[grpc_comment_to_response(comment) for comment in response.comments],
-            total=response.total,
-            page=response.page,
-            page_size=response.page_size
+            total=response.total if page else None,
+            page=response.page if page else None,
+            page_size=response.page_size,
+            next_cursor=response.next_cursor or None,
+            totals_mode=grpc_totals_mode(response)
         )
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.PERMISSION_DENIED:
@@ -198,6 +344,8 @@ async def list_comments(
                 status_code=403,
                 detail="No access to this post or post not found"
             )
+        elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
         raise HTTPException(
             status_code=500,
             detail=f"gRPC error: {e.details()}"
@@ -215,7 +363,7 @@ async def like_post(
         )
         if response is None:
             raise HTTPException(status_code=403, detail="No access to this post")
-        return LikeResponse(success=True)
+        return LikeResponse(success=True, liked=response.liked, like_count=response.like_count)
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.NOT_FOUND:
             raise HTTPException(status_code=404, detail="Post not found")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Union
 import datetime
 
 class PostBase(BaseModel):
@@ -13,12 +13,39 @@ class PostResponse(PostBase):
     created_at: datetime.datetime
     updated_at: datetime.datetime
     creator_id: int
+    comment_count: int = 0
+    like_count: int = 0
+
+class PartialPostResponse(BaseModel):
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime.datetime] = None
+    updated_at: Optional[datetime.datetime] = None
+    is_private: Optional[bool] = None
+    creator_id: Optional[int] = None
+    tags: Optional[List[str]] = None
+    comment_count: Optional[int] = None
+    like_count: Optional[int] = None
 
 class PostsListResponse(BaseModel):
-    posts: List[PostResponse]
-    total: int
-    page: int
+    posts: List[Union[PostResponse, PartialPostResponse]]
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
+    totals_mode: Optional[str] = None
+
+class BatchPostsRequest(BaseModel):
+    ids: List[int]
+
+class BatchPostItem(BaseModel):
+    id: int
+    found: bool
+    post: Optional[PostResponse] = None
+
+class BatchPostsResponse(BaseModel):
+    items: List[BatchPostItem]
 
 class CommentBase(BaseModel):
     description: str
@@ -31,9 +58,13 @@ class CommentResponse(CommentBase):
 
 class CommentsListResponse(BaseModel):
     comments: List[CommentResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
+    totals_mode: Optional[str] = None
 
 class LikeResponse(BaseModel):
-    success: bool
\ No newline at end of file
+    success: bool
+    liked: bool = False
+    like_count: int = 0
\ No newline at end of file
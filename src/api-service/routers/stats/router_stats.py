@@ -15,7 +15,8 @@ async def get_post_stats(post_id: int):
             post_id=response.post_id,
             views=response.views,
             likes=response.likes,
-            comments=response.comments
+            comments=response.comments,
+            unique_viewers=response.unique_viewers
         )
     except grpc.RpcError as e:
         raise HTTPException(status_code=500, detail=f"gRPC error: {e.details()}")
@@ -26,16 +27,21 @@ async def get_post_dynamics(post_id: int):
         views = client.get_post_timeline(post_id, "view").timeline
         likes = client.get_post_timeline(post_id, "like").timeline
         comments = client.get_post_timeline(post_id, "comment").timeline
+        viewers = client.get_post_timeline(post_id, "viewer").timeline
 
         timeline = {}
+        empty = {"views": 0, "likes": 0, "comments": 0, "unique_viewers": 0}
         for stat in views:
-            timeline[stat.date] = {"timestamp": stat.date, "views": stat.count, "likes": 0, "comments": 0}
+            timeline[stat.date] = {"timestamp": stat.date, **empty, "views": stat.count}
         for stat in likes:
-            timeline.setdefault(stat.date, {"timestamp": stat.date, "views": 0, "likes": 0, "comments": 0})
+            timeline.setdefault(stat.date, {"timestamp": stat.date, **empty})
             timeline[stat.date]["likes"] = stat.count
         for stat in comments:
-            timeline.setdefault(stat.date, {"timestamp": stat.date, "views": 0, "likes": 0, "comments": 0})
+            timeline.setdefault(stat.date, {"timestamp": stat.date, **empty})
             timeline[stat.date]["comments"] = stat.count
+        for stat in viewers:
+            timeline.setdefault(stat.date, {"timestamp": stat.date, **empty})
+            timeline[stat.date]["unique_viewers"] = stat.count
 
         sorted_data = sorted(timeline.values(), key=lambda x: x["timestamp"])
         return PostDynamics(
@@ -45,7 +51,8 @@ async def get_post_dynamics(post_id: int):
                     timestamp=date,
                     views=entry["views"],
                     likes=entry["likes"],
-                    comments=entry["comments"]
+                    comments=entry["comments"],
+                    unique_viewers=entry["unique_viewers"]
                 ) for date, entry in zip(timeline.keys(), sorted_data)
             ]
         )
@@ -53,21 +60,25 @@ async def get_post_dynamics(post_id: int):
         raise HTTPException(status_code=500, detail=f"gRPC error: {e.details()}")
 
 @router.get("/top/posts", response_model=TopPostsResponse)
-async def get_top_posts(metric: str = "post_viewed"):
+async def get_top_posts(metric: str = "post_viewed", limit: int = 10, window: str = "all"):
     try:
-        response = client.get_top_posts(metric)
+        response = client.get_top_posts(metric, limit, window)
         return TopPostsResponse(posts=[
             TopPost(post_id=p.post_id, score=p.count) for p in response.posts
         ])
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
         raise HTTPException(status_code=500, detail=f"gRPC error: {e.details()}")
 
 @router.get("/top/users", response_model=TopUsersResponse)
-async def get_top_users(metric: str = "post_viewed"):
+async def get_top_users(metric: str = "post_viewed", limit: int = 10, window: str = "all"):
     try:
-        response = client.get_top_users(metric)
+        response = client.get_top_users(metric, limit, window)
         return TopUsersResponse(users=[
             TopUser(user_id=u.user_id, score=u.count) for u in response.users
         ])
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
         raise HTTPException(status_code=500, detail=f"gRPC error: {e.details()}")
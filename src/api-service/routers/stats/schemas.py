@@ -8,6 +8,7 @@ class PostStats(BaseModel):
     views: int
     likes: int
     comments: int
+    unique_viewers: int
 
 
 class TimePointStats(BaseModel):
@@ -15,6 +16,7 @@ class TimePointStats(BaseModel):
     views: int
     likes: int
     comments: int
+    unique_viewers: int
 
 
 class PostDynamics(BaseModel):
@@ -19,11 +19,13 @@ class StatsServiceClient:
             return self.stub.GetPostLikesTimeline(request)
         elif metric == "comment":
             return self.stub.GetPostCommentsTimeline(request)
+        elif metric == "viewer":
+            return self.stub.GetPostUniqueViewersTimeline(request)
         else:
             raise ValueError("Unknown metric")
 
-    def get_top_posts(self, metric: str):
-        return self.stub.GetTopPosts(pb2.TopRequest(metric=metric))
+    def get_top_posts(self, metric: str, limit: int = 0, window: str = ""):
+        return self.stub.GetTopPosts(pb2.TopRequest(metric=metric, limit=limit, window=window))
 
-    def get_top_users(self, metric: str):
-        return self.stub.GetTopUsers(pb2.TopRequest(metric=metric))
+    def get_top_users(self, metric: str, limit: int = 0, window: str = ""):
+        return self.stub.GetTopUsers(pb2.TopRequest(metric=metric, limit=limit, window=window))
@@ -0,0 +1,58 @@
+import time
+
+from database import PostsDB, Post, PostTag, Comment
+
+POSTS = 2000
+BATCH_SIZE = 500
+TAGS_PER_POST = 3
+
+
+def clear(db):
+    with db.get_session() as session:
+        session.query(Comment).delete()
+        session.query(PostTag).delete()
+        session.query(Post).delete()
+
+
+def make_posts(count):
+    return [{
+        "title": f"Post {i}",
+        "description": "Benchmark post",
+        "creator_id": 1,
+        "is_private": False,
+        "tags": [f"tag{j}" for j in range(TAGS_PER_POST)]
+    } for i in range(count)]
+
+
+def bench_single(db, posts):
+    start = time.perf_counter()
+    for post in posts:
+        db.create_post(**post)
+    return time.perf_counter() - start
+
+
+def bench_bulk(db, posts):
+    start = time.perf_counter()
+    for i in range(0, len(posts), BATCH_SIZE):
+        db.create_posts(posts[i:i + BATCH_SIZE])
+    return time.perf_counter() - start
+
+
+def main():
+    db = PostsDB()
+    posts = make_posts(POSTS)
+
+    clear(db)
+    single = bench_single(db, posts)
+    clear(db)
+    bulk = bench_bulk(db, posts)
+    clear(db)
+
+    print(f"{'mode':>8} {'posts':>8} {'seconds':>10} {'posts/s':>10}")
+    print(f"{'single':>8} {POSTS:>8} {single:>10.2f} {POSTS / single:>10.0f}")
+    print(f"{'bulk':>8} {POSTS:>8} {bulk:>10.2f} {POSTS / bulk:>10.0f}")
+    print(f"speedup: {single / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import datetime
+import json
+import statistics
+import time
+
+import events_pb2
+from event_codec import EPOCH, encode_event
+from posts_service import PostsService
+
+REPEATS = 20000
+
+
+def make_events():
+    now = datetime.datetime.now()
+    # event builders only need the service class, not a database
+    service = PostsService.__new__(PostsService)
+    return [
+        service._post_created_event({"id": 123456, "creator_id": 42, "is_private": False, "created_at": now})[2],
+        service._post_viewed_event(42, 123456)[2],
+        service._post_commented_event(42, 123456, 987654)[2]
+    ]
+
+
+def decode_json(payload):
+    data = json.loads(payload.decode('utf-8'))
+    ts_str = data.get("timestamp") or data.get("created_at")
+    return data["event_type"], data["post_id"], datetime.datetime.fromisoformat(ts_str)
+
+
+def decode_protobuf(payload):
+    event = events_pb2.Event.FromString(payload)
+    event_type = event.WhichOneof("payload")
+    data = getattr(event, event_type)
+    timestamp = data.created_at if event_type == "post_created" else data.timestamp
+    return event_type, data.post_id, EPOCH + datetime.timedelta(milliseconds=timestamp)
+
+
+def measure(fn, value):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(value)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    print(f"{'event':>15} {'format':>9} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+    for event in make_events():
+        for event_format, decode in (("json", decode_json), ("protobuf", decode_protobuf)):
+            payload, _ = encode_event(event, event_format)
+            encode_us = measure(lambda value: encode_event(value, event_format), event)
+            decode_us = measure(decode, payload)
+            print(f"{event['event_type']:>15} {event_format:>9} {len(payload):>6} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import datetime
+import sys
+import time
+
+from sqlalchemy import insert, select
+
+from database import PostsDB, Post, PostTag, Comment, explain, plan_indexes, page_query, encode_cursor
+
+POSTS = 50000
+CREATORS = 500
+PRIVATE_EVERY = 10
+TAGS_PER_POST = 3
+TAGS = 500
+COMMENTS = 5000
+BATCH_SIZE = 1000
+PAGE_SIZE = 10
+
+
+def seed(db):
+    with db.get_session() as session:
+        session.query(Comment).delete()
+        session.query(PostTag).delete()
+        session.query(Post).delete()
+    for start in range(0, POSTS, BATCH_SIZE):
+        db.create_posts([{
+            "title": f"Post {i}",
+            "description": "Benchmark post",
+            "creator_id": i % CREATORS,
+            "is_private": i % PRIVATE_EVERY == 0,
+            "tags": [f"tag{(i + j * 7) % TAGS}" for j in range(TAGS_PER_POST)]
+        } for i in range(start, min(start + BATCH_SIZE, POSTS))])
+
+    with db.get_session() as session:
+        post_id = session.query(Post.id).order_by(Post.id.desc()).limit(1).scalar()
+        now = datetime.datetime.now()
+        session.execute(insert(Comment.__table__), [{
+            "description": f"Comment {i}",
+            "created_at": now - datetime.timedelta(seconds=i),
+            "post_id": post_id - i % 50,
+            "creator_id": i % CREATORS
+        } for i in range(COMMENTS)])
+        for table in ("posts", "posts_tags", "comments"):
+            session.connection().exec_driver_sql(f"ANALYZE {table}")
+    return post_id
+
+
+def tag_query(db, session, user_id):
+    tag_ids = db._tag_ids(session, ["tag7"])
+    tagged = select(PostTag.post_id).where(PostTag.tag_id.in_(tag_ids.values()))
+    query = db.visible_posts_query(session, user_id).filter(Post.id.in_(tagged))
+    return page_query(query, Post.created_at, Post.id, 1, PAGE_SIZE)
+
+
+def hot_paths(db, session, user_id, post_id):
+    posts_query = db.visible_posts_query(session, user_id)
+    last = page_query(posts_query, Post.created_at, Post.id, 1, PAGE_SIZE).all()[-1]
+    post_ids = [post.id for post in page_query(posts_query, Post.created_at, Post.id, 1, PAGE_SIZE)]
+    comments_query = session.query(Comment).filter(Comment.post_id == post_id)
+
+    return [
+        ("list_posts page", page_query(posts_query, Post.created_at, Post.id, 1, PAGE_SIZE),
+         "ix_posts_created_at_id"),
+        ("list_posts cursor", page_query(posts_query, Post.created_at, Post.id, None, PAGE_SIZE,
+                                         encode_cursor(last.created_at, last.id)),
+         "ix_posts_created_at_id"),
+        ("private total", session.query(Post.id).filter(Post.is_private == True, Post.creator_id == user_id),
+         "ix_posts_creator_created_at_id"),
+        ("load tags", session.query(PostTag.post_id, PostTag.name).filter(PostTag.post_id.in_(post_ids))
+         .order_by(PostTag.post_id, PostTag.id), "ix_posts_tags_post_id"),
+        ("list_posts_by_tag", tag_query(db, session, user_id), "ux_posts_tags_tag_id_post_id"),
+        ("list_comments page", page_query(comments_query, Comment.created_at, Comment.id, 1, PAGE_SIZE),
+         "ix_comments_post_created_at_id")
+    ]
+
+
+def main():
+    db = PostsDB()
+    print(f"schema version {db.schema_version}, seeding {POSTS} posts...")
+    post_id = seed(db)
+
+    missing = []
+    print(f"{'query':>20} {'node':>18} {'ms':>8}  indexes")
+    with db.get_session() as session:
+        for name, query, expected in hot_paths(db, session, 1, post_id):
+            plan = explain(session, query.statement)
+            start = time.perf_counter()
+            query.all()
+            elapsed = (time.perf_counter() - start) * 1000
+            indexes = plan_indexes(plan)
+            print(f"{name:>20} {plan['Node Type']:>18} {elapsed:>8.2f}  {', '.join(sorted(indexes)) or '-'}")
+            if expected not in indexes:
+                missing.append((name, expected))
+
+    for name, expected in missing:
+        print(f"{name}: expected {expected} in plan")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
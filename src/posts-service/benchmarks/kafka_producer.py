@@ -0,0 +1,100 @@
+import threading
+import time
+
+from kafka_profucer import KafkaProducer
+
+MESSAGES = 5000
+ROUND_TRIP = 0.002
+LINGER = 0.005
+BATCH_MESSAGES = 1000
+QUEUE_SIZES = [100000, 100]
+BATCH_SIZE = 500
+
+
+class MockProducer:
+    def __init__(self, max_messages=100000, round_trip=ROUND_TRIP, linger=LINGER):
+        self.max_messages = max_messages
+        self.round_trip = round_trip
+        self.linger = linger
+        self.queue = []
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def produce(self, topic, key, value, headers, on_delivery):
+        with self.condition:
+            if len(self.queue) + self.in_flight >= self.max_messages:
+                raise BufferError("Local: Queue full")
+            self.queue.append(on_delivery)
+            self.condition.notify_all()
+
+    def _send(self, linger):
+        with self.condition:
+            if not self.queue:
+                return 0
+            if linger:
+                self.condition.wait_for(lambda: len(self.queue) >= BATCH_MESSAGES, linger)
+            batch, self.queue = self.queue, []
+            self.in_flight += len(batch)
+        time.sleep(self.round_trip)
+        for on_delivery in batch:
+            on_delivery(None, None)
+        with self.condition:
+            self.in_flight -= len(batch)
+            self.condition.notify_all()
+        return len(batch)
+
+    def poll(self, timeout=0):
+        with self.condition:
+            if not self.queue and timeout:
+                self.condition.wait(timeout)
+        return self._send(self.linger)
+
+    def flush(self, timeout=None):
+        while self._send(0):
+            pass
+        with self.condition:
+            while self.in_flight:
+                self.condition.wait()
+        return len(self)
+
+    def __len__(self):
+        return len(self.queue) + self.in_flight
+
+
+def bench_produce(mode, max_messages):
+    producer = KafkaProducer(MockProducer(max_messages), mode=mode)
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        producer.produce("post-interactions", str(i), {"event_type": "post_viewed", "post_id": i})
+    enqueued = time.perf_counter() - start
+    producer.close()
+    return enqueued, time.perf_counter() - start, producer.stats()
+
+
+def bench_produce_batch(mode, max_messages):
+    producer = KafkaProducer(MockProducer(max_messages), mode=mode)
+    start = time.perf_counter()
+    for offset in range(0, MESSAGES, BATCH_SIZE):
+        producer.produce_batch("post-events", [
+            (str(i), {"event_type": "post_created", "post_id": i}) for i in range(offset, offset + BATCH_SIZE)
+        ])
+    elapsed = time.perf_counter() - start
+    producer.close()
+    return elapsed, elapsed, producer.stats()
+
+
+def main():
+    print(f"{MESSAGES} messages, {ROUND_TRIP * 1000:.0f} ms broker round trip")
+    print(f"{'call':>14} {'mode':>6} {'queue':>7} {'enqueue s':>10} {'total s':>8} {'msg/s':>9} "
+          f"{'produced':>9} {'failed':>7}")
+    runs = [("produce", "sync", QUEUE_SIZES[0], bench_produce)]
+    runs += [("produce", "async", size, bench_produce) for size in QUEUE_SIZES]
+    runs += [("produce_batch", "async", size, bench_produce_batch) for size in QUEUE_SIZES]
+    for call, mode, max_messages, bench in runs:
+        enqueued, total, stats = bench(mode, max_messages)
+        print(f"{call:>14} {mode:>6} {max_messages:>7} {enqueued:>10.3f} {total:>8.3f} {MESSAGES / total:>9.0f} "
+              f"{stats['produced']:>9} {stats['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import time
+import statistics
+
+from sqlalchemy import event
+
+from database import PostsDB, Post, PostTag, Comment
+
+PAGE_SIZES = [10, 50, 100, 500]
+POSTS = 1000
+TAGS_PER_POST = 3
+REPEATS = 20
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(db):
+    with db.get_session() as session:
+        session.query(Comment).delete()
+        session.query(PostTag).delete()
+        session.query(Post).delete()
+    for i in range(POSTS):
+        db.create_post(
+            title=f"Post {i}",
+            description="Benchmark post",
+            creator_id=1,
+            is_private=False,
+            tags=[f"tag{j}" for j in range(TAGS_PER_POST)]
+        )
+
+
+def list_posts_per_post_tags(db, page, page_size, user_id):
+    with db.get_session() as session:
+        query = session.query(Post).filter((Post.is_private == False) | (Post.creator_id == user_id))
+        query.count()
+        posts = query.order_by(Post.created_at.desc()) \
+            .offset((page - 1) * page_size) \
+            .limit(page_size) \
+            .all()
+        for post in posts:
+            session.query(PostTag.name).filter(PostTag.post_id == post.id).all()
+
+
+def measure(counter, fn, page_size):
+    timings = []
+    counter.count = 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(page=1, page_size=page_size, user_id=1)
+        timings.append((time.perf_counter() - start) * 1000)
+    return counter.count // REPEATS, statistics.median(timings)
+
+
+def main():
+    db = PostsDB()
+    seed(db)
+    counter = QueryCounter(db.engine)
+
+    print(f"{'page_size':>10} {'queries (per-post)':>20} {'ms (per-post)':>15} {'queries (batched)':>20} {'ms (batched)':>14}")
+    for page_size in PAGE_SIZES:
+        old_queries, old_ms = measure(counter, lambda **kw: list_posts_per_post_tags(db, **kw), page_size)
+        new_queries, new_ms = measure(counter, db.list_posts, page_size)
+        print(f"{page_size:>10} {old_queries:>20} {old_ms:>15.2f} {new_queries:>20} {new_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+
+from database import PostsDB, Post, PostTag, Comment
+
+CORPUS_SIZES = [1000, 10000, 50000, 100000]
+BATCH_SIZE = 1000
+WORDS_PER_POST = 30
+VOCABULARY = [f"word{i}" for i in range(5000)] + ["kafka", "grpc", "postgres", "clickhouse"]
+QUERIES = ["kafka", "grpc postgres", "\"kafka grpc\"", "word42 or word4242", "zeppelin"]
+REPEATS = 20
+PAGE_SIZE = 10
+
+
+def clear(db):
+    with db.get_session() as session:
+        session.query(Comment).delete()
+        session.query(PostTag).delete()
+        session.query(Post).delete()
+
+
+def grow(db, rng, current, target):
+    for start in range(current, target, BATCH_SIZE):
+        db.create_posts([{
+            "title": " ".join(rng.choices(VOCABULARY, k=5)),
+            "description": " ".join(rng.choices(VOCABULARY, k=WORDS_PER_POST)),
+            "creator_id": i % 100,
+            "is_private": i % 10 == 0,
+            "tags": []
+        } for i in range(start, min(start + BATCH_SIZE, target))])
+    with db.get_session() as session:
+        session.connection().exec_driver_sql("ANALYZE posts")
+
+
+def like_scan(db, query_text, page_size, user_id):
+    pattern = f"%{query_text.split()[0].strip(chr(34))}%"
+    with db.get_session() as session:
+        return db.visible_posts_query(session, user_id) \
+            .filter(Post.title.ilike(pattern) | Post.description.ilike(pattern)) \
+            .order_by(Post.created_at.desc(), Post.id.desc()) \
+            .limit(page_size) \
+            .all()
+
+
+def measure(fn):
+    timings = []
+    for _ in range(REPEATS):
+        for query_text in QUERIES:
+            start = time.perf_counter()
+            fn(query_text, PAGE_SIZE, 1)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    db = PostsDB()
+    rng = random.Random(42)
+    clear(db)
+
+    print(f"{'posts':>8} {'search p50 ms':>14} {'search p95 ms':>14} {'ilike p50 ms':>13} {'ilike p95 ms':>13}")
+    current = 0
+    for size in CORPUS_SIZES:
+        grow(db, rng, current, size)
+        current = size
+        search_p50, search_p95 = measure(db.search_posts)
+        like_p50, like_p95 = measure(lambda *args: like_scan(db, *args))
+        print(f"{size:>8} {search_p50:>14.2f} {search_p95:>14.2f} {like_p50:>13.2f} {like_p95:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+import grpc
+import posts_service_pb2
+import posts_service_pb2_grpc
+
+import posts_service
+from database import PostsDB
+
+MODES = {"threads": 5101, "async": 5102}
+CONCURRENCY = [10, 100, 1000]
+DURATION = 10
+POSTS = 1000
+
+
+def seed():
+    db = PostsDB()
+    created = db.create_posts([{
+        "title": f"Post {i}",
+        "description": "Benchmark post",
+        "creator_id": 1,
+        "is_private": False,
+        "tags": ["bench"]
+    } for i in range(POSTS)])
+    return [post["id"] for post in created[:20]]
+
+
+def scenarios(post_ids):
+    return {
+        "ListPosts": lambda stub: stub.ListPosts(posts_service_pb2.ListPostsRequest(page_size=10, user_id=1)),
+        "BatchGetPosts": lambda stub: stub.BatchGetPosts(
+            posts_service_pb2.BatchGetPostsRequest(ids=post_ids, user_id=1)
+        )
+    }
+
+
+async def worker(call, stub, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            await call(stub)
+            latencies.append(time.perf_counter() - start)
+        except grpc.aio.AioRpcError:
+            errors.append(1)
+
+
+async def run_load(port, call, concurrency):
+    async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+        stub = posts_service_pb2_grpc.PostsServiceStub(channel)
+        await call(stub)
+
+        latencies, errors = [], []
+        deadline = time.perf_counter() + DURATION
+        await asyncio.gather(*(worker(call, stub, deadline, latencies, errors) for _ in range(concurrency)))
+
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000 if len(latencies) > 1 else 0.0
+    return len(latencies) / DURATION, p99, len(errors)
+
+
+def main():
+    calls = scenarios(seed())
+    servers = {
+        mode: multiprocessing.Process(target=posts_service.serve, args=(mode, port), daemon=True)
+        for mode, port in MODES.items()
+    }
+    for server in servers.values():
+        server.start()
+    time.sleep(3)
+
+    try:
+        print(f"{'rpc':>14} {'mode':>8} {'concurrency':>12} {'rps':>10} {'p99 ms':>10} {'errors':>8}")
+        for name, call in calls.items():
+            for concurrency in CONCURRENCY:
+                for mode, port in MODES.items():
+                    rps, p99, errors = asyncio.run(run_load(port, call, concurrency))
+                    print(f"{name:>14} {mode:>8} {concurrency:>12} {rps:>10.0f} {p99:>10.1f} {errors:>8}")
+    finally:
+        for server in servers.values():
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import datetime
+import statistics
+import time
+
+import posts_service_pb2
+import posts_service_v2_pb2
+from posts_service import PostsService, PostsServiceV2, EPOCH
+
+PAGE_SIZE = 100
+REPEATS = 2000
+
+
+def make_page():
+    now = datetime.datetime.now()
+    return [{
+        "id": 1000000 + i,
+        "title": f"Post {i}",
+        "description": "Benchmark post with a description of typical length for a listing page",
+        "created_at": now - datetime.timedelta(minutes=i),
+        "updated_at": now,
+        "is_private": False,
+        "creator_id": i % 50,
+        "tags": ["python", "grpc", "benchmark"],
+        "comment_count": i,
+        "like_count": i * 2
+    } for i in range(PAGE_SIZE)]
+
+
+def parse_v1(message):
+    return [(datetime.datetime.fromisoformat(post.created_at), datetime.datetime.fromisoformat(post.updated_at))
+            for post in message.posts]
+
+
+def from_timestamp(value):
+    return EPOCH + datetime.timedelta(seconds=value.seconds, microseconds=value.nanos // 1000)
+
+
+def parse_v2(message):
+    return [(from_timestamp(post.created_at), from_timestamp(post.updated_at)) for post in message.posts]
+
+
+def measure(service, response_type, parse, page):
+    serialize_timings, parse_timings = [], []
+    payload = b""
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        payload = response_type(
+            posts=[service._map_to_proto_post(post) for post in page]
+        ).SerializeToString()
+        serialize_timings.append((time.perf_counter() - start) * 1e6)
+
+        start = time.perf_counter()
+        parse(response_type.FromString(payload))
+        parse_timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(serialize_timings), statistics.median(parse_timings), len(payload)
+
+
+def main():
+    page = make_page()
+    # mapping only needs the message module, not a database
+    v1 = PostsService.__new__(PostsService)
+    v2 = PostsServiceV2.__new__(PostsServiceV2)
+
+    print(f"{'format':>6} {'serialize us':>13} {'parse us':>10} {'total us':>10} {'bytes':>7}")
+    for name, service, response_type, parse in (
+        ("v1", v1, posts_service_pb2.ListPostsResponse, parse_v1),
+        ("v2", v2, posts_service_v2_pb2.ListPostsResponse, parse_v2)
+    ):
+        serialize_us, parse_us, size = measure(service, response_type, parse, page)
+        print(f"{name:>6} {serialize_us:>13.1f} {parse_us:>10.1f} {serialize_us + parse_us:>10.1f} {size:>7}")
+
+
+if __name__ == "__main__":
+    main()
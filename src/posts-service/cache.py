@@ -0,0 +1,136 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    def __init__(self, ttl, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _store(self, key, value):
+        if self.maxsize == 0:
+            return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._store(key, value)
+
+    def get_or_set(self, key, factory):
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = factory()
+            with self._lock:
+                if value is not None and generation == self._generation:
+                    self._store(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VisibilityIndex:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, post_id):
+        entry = self._entries.get(post_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        packed = entry[0]
+        return bool(packed & 1), packed >> 1
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def set(self, post_id, is_private, creator_id, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if post_id not in self._entries and len(self._entries) >= self.maxsize:
+                if not self._entries:
+                    return
+                del self._entries[next(iter(self._entries))]
+            packed = (creator_id << 1) | int(bool(is_private))
+            self._entries[post_id] = (packed, time.monotonic() + self.ttl)
+
+    def invalidate(self, post_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(post_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
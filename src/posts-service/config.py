@@ -0,0 +1,38 @@
+import os
+
+TOTALS_MODE = os.getenv("POSTS_TOTALS_MODE", "exact")
+TOTALS_CACHE_TTL = float(os.getenv("POSTS_TOTALS_CACHE_TTL", "30"))
+TOTALS_CACHE_SIZE = int(os.getenv("POSTS_TOTALS_CACHE_SIZE", "10000"))
+
+POST_CACHE_TTL = float(os.getenv("POST_CACHE_TTL", "60"))
+POST_CACHE_SIZE = int(os.getenv("POST_CACHE_SIZE", "10000"))
+
+VISIBILITY_INDEX_SIZE = int(os.getenv("POSTS_VISIBILITY_INDEX_SIZE", "1000000"))
+VISIBILITY_INDEX_TTL = float(os.getenv("POSTS_VISIBILITY_INDEX_TTL", "300"))
+
+BATCH_GET_MAX_IDS = int(os.getenv("POSTS_BATCH_GET_MAX_IDS", "500"))
+STREAM_CHUNK_SIZE = int(os.getenv("POSTS_STREAM_CHUNK_SIZE", "1000"))
+BULK_CREATE_BATCH_SIZE = int(os.getenv("POSTS_BULK_CREATE_BATCH_SIZE", "500"))
+
+SERVER_MODE = os.getenv("POSTS_SERVER_MODE", "threads")
+GRPC_PORT = int(os.getenv("POSTS_GRPC_PORT", "5000"))
+GRPC_MAX_WORKERS = int(os.getenv("POSTS_GRPC_MAX_WORKERS", "10"))
+
+DB_POOL_SIZE = int(os.getenv("POSTS_DB_POOL_SIZE", str(GRPC_MAX_WORKERS)))
+DB_MAX_OVERFLOW = int(os.getenv("POSTS_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("POSTS_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("POSTS_DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("POSTS_DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+OUTBOX_BATCH_SIZE = int(os.getenv("POSTS_OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_LINGER = float(os.getenv("POSTS_OUTBOX_LINGER", "0.05"))
+
+KAFKA_BROKER = os.getenv("KAFKA_BROKER", "kafka:9092")
+KAFKA_PRODUCER_MODE = os.getenv("POSTS_KAFKA_PRODUCER_MODE", "async")
+KAFKA_EVENT_FORMAT = os.getenv("POSTS_KAFKA_EVENT_FORMAT", "protobuf")
+KAFKA_LINGER_MS = int(os.getenv("POSTS_KAFKA_LINGER_MS", "20"))
+KAFKA_BATCH_SIZE = int(os.getenv("POSTS_KAFKA_BATCH_SIZE", "262144"))
+KAFKA_COMPRESSION = os.getenv("POSTS_KAFKA_COMPRESSION", "lz4")
+KAFKA_QUEUE_MAX_MESSAGES = int(os.getenv("POSTS_KAFKA_QUEUE_MAX_MESSAGES", "100000"))
+KAFKA_QUEUE_TIMEOUT = float(os.getenv("POSTS_KAFKA_QUEUE_TIMEOUT", "5"))
+KAFKA_FLUSH_TIMEOUT = float(os.getenv("POSTS_KAFKA_FLUSH_TIMEOUT", "30"))
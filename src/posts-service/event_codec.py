@@ -0,0 +1,34 @@
+import datetime
+import json
+
+import events_pb2
+
+EVENT_FORMATS = ("json", "protobuf")
+SCHEMA_VERSION_HEADER = "schema-version"
+SCHEMA_VERSIONS = {
+    "json": 1,
+    "protobuf": 2
+}
+TIMESTAMP_FIELDS = ("timestamp", "created_at", "registration_date")
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+def to_epoch_ms(value):
+    return (datetime.datetime.fromisoformat(value) - EPOCH) // datetime.timedelta(milliseconds=1)
+
+def encode_protobuf(value):
+    fields = {key: field for key, field in value.items() if key not in ("event_type", "metadata")}
+    fields.update(value.get("metadata", {}))
+    for name in TIMESTAMP_FIELDS:
+        if name in fields:
+            fields[name] = to_epoch_ms(fields[name])
+    return events_pb2.Event(**{value["event_type"]: fields}).SerializeToString()
+
+def encode_event(value, event_format):
+    if event_format == "protobuf":
+        payload = encode_protobuf(value)
+    elif event_format == "json":
+        payload = json.dumps(value).encode('utf-8')
+    else:
+        raise ValueError(f"Unknown event format: {event_format}")
+    return payload, [(SCHEMA_VERSION_HEADER, str(SCHEMA_VERSIONS[event_format]).encode())]
@@ -1 +1,3 @@
-python -m grpc_tools.protoc -I./proto --python_out=. --grpc_python_out=. ./proto/posts_service.proto
\ No newline at end of file
+python -m grpc_tools.protoc -I./proto --python_out=. --grpc_python_out=. ./proto/posts_service.proto
+python -m grpc_tools.protoc -I./proto --python_out=. --grpc_python_out=. ./proto/posts_service_v2.proto
+python -m grpc_tools.protoc -I./proto --python_out=. ./proto/events.proto
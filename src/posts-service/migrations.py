@@ -0,0 +1,120 @@
+import datetime
+
+MIGRATIONS_TABLE = "posts_schema_migrations"
+MIGRATIONS_LOCK_ID = 7201
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS posts (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR NOT NULL,
+            description VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            is_private BOOLEAN,
+            creator_id INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_posts_id ON posts (id)",
+        """
+        CREATE TABLE IF NOT EXISTS posts_tags (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            post_id INTEGER REFERENCES posts (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_posts_tags_id ON posts_tags (id)",
+        """
+        CREATE TABLE IF NOT EXISTS comments (
+            id SERIAL PRIMARY KEY,
+            description VARCHAR NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            post_id INTEGER REFERENCES posts (id) ON DELETE CASCADE,
+            creator_id INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_comments_id ON comments (id)"
+    ]),
+    (2, "hot path indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_posts_created_at_id ON posts (created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_creator_created_at_id ON posts (creator_id, created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_tags_post_id ON posts_tags (post_id, id)",
+        "CREATE INDEX IF NOT EXISTS ix_comments_post_created_at_id ON comments (post_id, created_at DESC, id DESC)",
+        "ANALYZE posts",
+        "ANALYZE posts_tags",
+        "ANALYZE comments"
+    ]),
+    (3, "tag dictionary", [
+        """
+        CREATE TABLE IF NOT EXISTS tags (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL UNIQUE
+        )
+        """,
+        "INSERT INTO tags (name) SELECT DISTINCT name FROM posts_tags ON CONFLICT (name) DO NOTHING",
+        "ALTER TABLE posts_tags ADD COLUMN IF NOT EXISTS tag_id INTEGER REFERENCES tags (id)",
+        "UPDATE posts_tags SET tag_id = tags.id FROM tags WHERE tags.name = posts_tags.name AND posts_tags.tag_id IS NULL",
+        "DELETE FROM posts_tags a USING posts_tags b WHERE a.post_id = b.post_id AND a.tag_id = b.tag_id AND a.id > b.id",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_posts_tags_tag_id_post_id ON posts_tags (tag_id, post_id)",
+        "ANALYZE tags",
+        "ANALYZE posts_tags"
+    ]),
+    (4, "post search vector", [
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+        "ANALYZE posts"
+    ]),
+    (5, "engagement counters", [
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS comment_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS like_count INTEGER NOT NULL DEFAULT 0",
+        """
+        CREATE TABLE IF NOT EXISTS post_likes (
+            post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (post_id, user_id)
+        )
+        """,
+        "UPDATE posts SET comment_count = counts.total FROM "
+        "(SELECT post_id, count(*) AS total FROM comments GROUP BY post_id) AS counts "
+        "WHERE posts.id = counts.post_id"
+    ]),
+    (6, "event outbox", [
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id BIGSERIAL PRIMARY KEY,
+            topic VARCHAR NOT NULL,
+            key VARCHAR,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    ])
+]
+
+
+def applied_versions(connection):
+    return {row[0] for row in connection.exec_driver_sql(f"SELECT version FROM {MIGRATIONS_TABLE}")}
+
+
+def migrate(engine, migrations=MIGRATIONS):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATIONS_LOCK_ID})")
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL)"
+        )
+        applied = applied_versions(connection)
+        for version, name, statements in migrations:
+            if version in applied:
+                continue
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(
+                f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (%(version)s, %(name)s, %(applied_at)s)",
+                {"version": version, "name": name, "applied_at": datetime.datetime.now()}
+            )
+        return max(applied_versions(connection), default=0)
@@ -0,0 +1,71 @@
+from sqlalchemy import delete
+
+from database import OutboxEvent
+from config import OUTBOX_BATCH_SIZE, OUTBOX_LINGER
+
+import threading
+
+
+class OutboxRelay:
+    def __init__(self, db, producer, batch_size=OUTBOX_BATCH_SIZE, linger=OUTBOX_LINGER):
+        self.db = db
+        self.producer = producer
+        self.batch_size = batch_size
+        self.linger = linger
+        self.published = 0
+        self.batches = 0
+        self.errors = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def relay_once(self):
+        with self.db.get_session() as session:
+            events = session.query(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.key, OutboxEvent.payload) \
+                .order_by(OutboxEvent.id) \
+                .limit(self.batch_size) \
+                .with_for_update(skip_locked=True) \
+                .all()
+            if not events:
+                return 0
+
+            by_topic = {}
+            for event in events:
+                by_topic.setdefault(event.topic, []).append((event.key, event.payload))
+            for topic, messages in by_topic.items():
+                self.producer.produce_batch(topic, messages)
+
+            session.execute(delete(OutboxEvent.__table__).where(OutboxEvent.id.in_([event.id for event in events])))
+
+        self.published += len(events)
+        self.batches += 1
+        return len(events)
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                relayed = self.relay_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Outbox relay error: {e}", flush=True)
+                relayed = 0
+            if relayed < self.batch_size:
+                self._stopped.wait(self.linger)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        while self.relay_once():
+            pass
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "batches": self.batches,
+            "errors": self.errors
+        }
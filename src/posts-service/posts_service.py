@@ -1,35 +1,50 @@
 from database import PostsDB
+from async_database import AsyncPostsDB
+from config import BULK_CREATE_BATCH_SIZE, SERVER_MODE, GRPC_PORT, GRPC_MAX_WORKERS
 
 import grpc
 import posts_service_pb2
 import posts_service_pb2_grpc
+import posts_service_v2_pb2
+import posts_service_v2_pb2_grpc
 from concurrent import futures
+import asyncio
 import datetime
+import uuid
 
 from kafka_profucer import KafkaProducer
+from outbox import OutboxRelay
+
+TOTALS_MODES = {
+    None: posts_service_pb2.TOTALS_MODE_NONE,
+    "exact": posts_service_pb2.TOTALS_MODE_EXACT,
+    "cached": posts_service_pb2.TOTALS_MODE_CACHED,
+    "estimated": posts_service_pb2.TOTALS_MODE_ESTIMATED
+}
 
 class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
-    def __init__(self):
-        self.db = PostsDB()
-        self.kafka_producer = KafkaProducer()
+    messages = posts_service_pb2
+
+    def __init__(self, db=None, kafka_producer=None, outbox=None):
+        self.db = db or PostsDB()
+        self.kafka_producer = kafka_producer or KafkaProducer()
+        self.outbox = outbox
+
+    def _encode_timestamp(self, value):
+        return value.isoformat()
 
     def _map_to_proto_post(self, post_data):
-        return posts_service_pb2.Post(
-            id=post_data["id"],
-            title=post_data["title"],
-            description=post_data["description"],
-            created_at=post_data["created_at"].isoformat(),
-            updated_at=post_data["updated_at"].isoformat(),
-            is_private=post_data["is_private"],
-            creator_id=post_data["creator_id"],
-            tags=post_data["tags"]
-        )
+        fields = dict(post_data)
+        for key in ("created_at", "updated_at"):
+            if key in fields:
+                fields[key] = self._encode_timestamp(fields[key])
+        return self.messages.Post(**fields)
 
     def _map_to_proto_comment(self, comment_data):
-        return posts_service_pb2.Comment(
+        return self.messages.Comment(
             id=comment_data["id"],
             description=comment_data["description"],
-            created_at=comment_data["created_at"].isoformat(),
+            created_at=self._encode_timestamp(comment_data["created_at"]),
             post_id=comment_data["post_id"],
             creator_id=comment_data["creator_id"]
         )
@@ -39,6 +54,89 @@ class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
         context.set_details(f"Database error: {str(e)}")
         return None
 
+    def _handle_invalid_argument(self, context, e):
+        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details(str(e))
+        return None
+
+    def _post_created_event(self, post_data):
+        return "post-events", str(post_data["id"]), {
+            "event_type": "post_created",
+            "event_id": uuid.uuid4().hex,
+            "post_id": post_data["id"],
+            "creator_id": post_data["creator_id"],
+            "created_at": post_data["created_at"].isoformat(),
+            "metadata": {
+                "is_private": post_data["is_private"]
+            }
+        }
+
+    def _post_viewed_event(self, user_id, post_id):
+        return "post-interactions", f"{user_id}-{post_id}", {
+            "event_type": "post_viewed",
+            "event_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "post_id": post_id,
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def _post_commented_event(self, user_id, post_id, comment_id):
+        return "post-interactions", f"{user_id}-{post_id}", {
+            "event_type": "post_commented",
+            "event_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "post_id": post_id,
+            "comment_id": comment_id,
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def _post_liked_event(self, user_id, post_id):
+        return "post-interactions", f"{user_id}-{post_id}", {
+            "event_type": "post_liked",
+            "event_id": f"post_liked:{post_id}:{user_id}",
+            "user_id": user_id,
+            "post_id": post_id,
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def _batch_get_posts_response(self, post_ids, posts):
+        return self.messages.BatchGetPostsResponse(
+            items=[
+                self.messages.BatchGetPostsItem(
+                    id=post_id,
+                    found=post_data is not None,
+                    post=self._map_to_proto_post(post_data) if post_data else None
+                ) for post_id, post_data in zip(post_ids, posts)
+            ]
+        )
+
+    def _list_posts_response(self, result):
+        return self.messages.ListPostsResponse(
+            posts=[self._map_to_proto_post(post) for post in result["posts"]],
+            total=result["total"] or 0,
+            page=result["page"],
+            page_size=result["page_size"],
+            next_cursor=result["next_cursor"],
+            totals_mode=TOTALS_MODES[result["totals_mode"]]
+        )
+
+    def _search_posts_response(self, result):
+        return self.messages.SearchPostsResponse(
+            posts=[self._map_to_proto_post(post) for post in result["posts"]],
+            page_size=result["page_size"],
+            next_cursor=result["next_cursor"]
+        )
+
+    def _list_comments_response(self, result):
+        return self.messages.ListCommentsResponse(
+            comments=[self._map_to_proto_comment(comment) for comment in result["comments"]],
+            total=result["total"] or 0,
+            page=result["page"],
+            page_size=result["page_size"],
+            next_cursor=result["next_cursor"],
+            totals_mode=TOTALS_MODES[result["totals_mode"]]
+        )
+
     def CreatePost(self, request, context):
         try:
             post_data = self.db.create_post(
@@ -46,30 +144,58 @@ class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
                 description=request.description,
                 creator_id=request.creator_id,
                 is_private=request.is_private,
-                tags=request.tags
+                tags=request.tags,
+                events=lambda post_data: [self._post_created_event(post_data)]
             )
 
-            event = {
-                "event_type": "post_created",
-                "post_id": post_data["id"],
-                "creator_id": post_data["creator_id"],
-                "created_at": post_data["created_at"].isoformat(),
-                "metadata": {
-                    "is_private": post_data["is_private"]
-                }
-            }
-            self.kafka_producer.produce(
-                topic="post-events",
-                key=str(post_data["id"]),
-                value=event
+            return self.messages.CreatePostResponse(
+                post=self._map_to_proto_post(post_data)
             )
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.CreatePostResponse()
 
-            return posts_service_pb2.CreatePostResponse(
-                post=self._map_to_proto_post(post_data)
+    def _create_posts_batch(self, requests, first_index):
+        try:
+            created = self.db.create_posts([{
+                "title": request.title,
+                "description": request.description,
+                "creator_id": request.creator_id,
+                "is_private": request.is_private,
+                "tags": request.tags
+            } for request in requests], events=lambda post_data: [self._post_created_event(post_data)])
+        except Exception as e:
+            return [
+                self.messages.BulkCreatePostsResult(index=first_index + i, error=f"Database error: {str(e)}")
+                for i in range(len(requests))
+            ]
+
+        return [
+            self.messages.BulkCreatePostsResult(index=first_index + i, post=self._map_to_proto_post(post_data))
+            for i, post_data in enumerate(created)
+        ]
+
+    def BulkCreatePosts(self, request_iterator, context):
+        try:
+            results = []
+            batch = []
+            for request in request_iterator:
+                batch.append(request)
+                if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                    results.extend(self._create_posts_batch(batch, len(results)))
+                    batch = []
+            if batch:
+                results.extend(self._create_posts_batch(batch, len(results)))
+
+            failed = sum(1 for result in results if result.error)
+            return self.messages.BulkCreatePostsResponse(
+                results=results,
+                created=len(results) - failed,
+                failed=failed
             )
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.CreatePostResponse()
+            return self.messages.BulkCreatePostsResponse()
 
     def DeletePost(self, request, context):
         try:
@@ -77,10 +203,10 @@ class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
             if not success:
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("Permission denied or post not found")
-            return posts_service_pb2.DeletePostResponse()
+            return self.messages.DeletePostResponse()
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.DeletePostResponse()
+            return self.messages.DeletePostResponse()
 
     def UpdatePost(self, request, context):
         try:
@@ -95,91 +221,126 @@ class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
             if not post_data:
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("Permission denied or post not found")
-                return posts_service_pb2.UpdatePostResponse()
+                return self.messages.UpdatePostResponse()
 
-            return posts_service_pb2.UpdatePostResponse(
+            return self.messages.UpdatePostResponse(
                 post=self._map_to_proto_post(post_data)
             )
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.UpdatePostResponse()
+            return self.messages.UpdatePostResponse()
 
     def GetPost(self, request, context):
         try:
-            post_data = self.db.get_post(request.id, request.user_id)
+            post_data = self.db.get_post(request.id, request.user_id, fields=list(request.fields.paths) or None)
             if not post_data:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
                 context.set_details("Post not found or access denied")
-                return posts_service_pb2.GetPostResponse()
+                return self.messages.GetPostResponse()
 
-            event = {
-                "event_type": "post_viewed",
-                "user_id": request.user_id,
-                "post_id": request.id,
-                "timestamp": datetime.datetime.now().isoformat()
-            }
-            self.kafka_producer.produce(
-                topic="post-interactions",
-                key=f"{request.user_id}-{request.id}",
-                value=event
-            )
+            self.db.add_events([self._post_viewed_event(request.user_id, request.id)])
 
-            return posts_service_pb2.GetPostResponse(
+            return self.messages.GetPostResponse(
                 post=self._map_to_proto_post(post_data)
             )
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.GetPostResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.GetPostResponse()
+
+    def BatchGetPosts(self, request, context):
+        try:
+            posts = self.db.get_posts(list(request.ids), request.user_id)
+            return self._batch_get_posts_response(request.ids, posts)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.BatchGetPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.BatchGetPostsResponse()
+
+    def StreamPosts(self, request, context):
+        try:
+            for post_data in self.db.iter_posts(request.user_id, request.chunk_size):
+                yield self._map_to_proto_post(post_data)
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.GetPostResponse()
 
     def ListPosts(self, request, context):
         try:
             result = self.db.list_posts(
                 page=request.page,
                 page_size=request.page_size,
-                user_id=request.user_id
+                user_id=request.user_id,
+                cursor=request.cursor,
+                fields=list(request.fields.paths) or None
             )
-            return posts_service_pb2.ListPostsResponse(
-                posts=[self._map_to_proto_post(post) for post in result["posts"]],
-                total=result["total"],
-                page=result["page"],
-                page_size=result["page_size"]
+            return self._list_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.ListPostsResponse()
+
+    def ListPostsByTag(self, request, context):
+        try:
+            result = self.db.list_posts_by_tag(
+                tags=list(request.tags),
+                match_all=request.match_all,
+                page=request.page,
+                page_size=request.page_size,
+                user_id=request.user_id,
+                cursor=request.cursor
             )
+            return self._list_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListPostsResponse()
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.ListPostsResponse()
+            return self.messages.ListPostsResponse()
+
+    def SearchPosts(self, request, context):
+        try:
+            result = self.db.search_posts(
+                query_text=request.query,
+                page_size=request.page_size,
+                user_id=request.user_id,
+                cursor=request.cursor
+            )
+            return self._search_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.SearchPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.SearchPostsResponse()
 
     def CommentPost(self, request, context):
         try:
             if not self.db.can_access_post(request.post_id, request.creator_id):
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("No access to this post")
-                return posts_service_pb2.CommentPostResponse()
+                return self.messages.CommentPostResponse()
 
             comment_data = self.db.create_comment(
                 description=request.description,
                 post_id=request.post_id,
-                creator_id=request.creator_id
-            )
-
-            event = {
-                "event_type": "post_commented",
-                "user_id": request.creator_id,
-                "post_id": request.post_id,
-                "comment_id": comment_data["id"],
-                "timestamp": datetime.datetime.now().isoformat()
-            }
-            self.kafka_producer.produce(
-                topic="post-interactions",
-                key=f"{request.creator_id}-{request.post_id}",
-                value=event
+                creator_id=request.creator_id,
+                events=lambda comment_data: [
+                    self._post_commented_event(request.creator_id, request.post_id, comment_data["id"])
+                ]
             )
 
-            return posts_service_pb2.CommentPostResponse(
+            return self.messages.CommentPostResponse(
                 comment=self._map_to_proto_comment(comment_data)
             )
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.CommentPostResponse()
+            return self.messages.CommentPostResponse()
 
     def ListComments(self, request, context):
         try:
@@ -187,55 +348,276 @@ class PostsService(posts_service_pb2_grpc.PostsServiceServicer):
                 post_id=request.post_id,
                 user_id=request.user_id,
                 page=request.page,
-                page_size=request.page_size
+                page_size=request.page_size,
+                cursor=request.cursor
             )
 
             if result is None:
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("No access to this post or post not found")
-                return posts_service_pb2.ListCommentsResponse()
+                return self.messages.ListCommentsResponse()
 
-            return posts_service_pb2.ListCommentsResponse(
-                comments=[self._map_to_proto_comment(comment) for comment in result["comments"]],
-                total=result["total"],
-                page=result["page"],
-                page_size=result["page_size"]
-            )
+            return self._list_comments_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListCommentsResponse()
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.ListCommentsResponse()
+            return self.messages.ListCommentsResponse()
 
     def LikePost(self, request, context):
         try:
             if not self.db.can_access_post(request.post_id, request.user_id):
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED)
                 context.set_details("No access to this post")
-                return posts_service_pb2.LikePostResponse()
+                return self.messages.LikePostResponse()
 
-            event = {
-                "event_type": "post_liked",
-                "user_id": request.user_id,
-                "post_id": request.post_id,
-                "timestamp": datetime.datetime.now().isoformat()
-            }
-            self.kafka_producer.produce(
-                topic="post-interactions",
-                key=f"{request.user_id}-{request.post_id}",
-                value=event
+            result = self.db.like_post(
+                request.post_id,
+                request.user_id,
+                events=lambda like: [self._post_liked_event(like["user_id"], like["post_id"])]
+            )
+
+            return self.messages.LikePostResponse(**result)
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.LikePostResponse()
+
+    def _metrics(self):
+        metrics = self.db.metrics()
+        for key, value in self.kafka_producer.stats().items():
+            metrics[f"kafka.{key}"] = value
+        if self.outbox is not None:
+            for key, value in self.outbox.stats().items():
+                metrics[f"outbox.{key}"] = value
+        return metrics
+
+    def GetMetrics(self, request, context):
+        return self.messages.GetMetricsResponse(metrics=self._metrics())
+
+class AsyncPostsService(PostsService):
+    def __init__(self, db=None, kafka_producer=None, async_db=None, outbox=None):
+        super().__init__(db, kafka_producer, outbox)
+        self.async_db = async_db or AsyncPostsDB(self.db)
+
+    def GetMetrics(self, request, context):
+        metrics = self._metrics()
+        metrics.update(self.async_db.metrics())
+        return self.messages.GetMetricsResponse(metrics=metrics)
+
+    async def GetPost(self, request, context):
+        try:
+            post_data = await self.async_db.get_post(request.id, request.user_id, fields=list(request.fields.paths) or None)
+            if not post_data:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details("Post not found or access denied")
+                return self.messages.GetPostResponse()
+
+            await self.async_db.add_events([self._post_viewed_event(request.user_id, request.id)])
+
+            return self.messages.GetPostResponse(
+                post=self._map_to_proto_post(post_data)
             )
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.GetPostResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.GetPostResponse()
+
+    async def BatchGetPosts(self, request, context):
+        try:
+            posts = await self.async_db.get_posts(list(request.ids), request.user_id)
+            return self._batch_get_posts_response(request.ids, posts)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.BatchGetPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.BatchGetPostsResponse()
+
+    async def StreamPosts(self, request, context):
+        try:
+            async for post_data in self.async_db.iter_posts(request.user_id, request.chunk_size):
+                yield self._map_to_proto_post(post_data)
+        except Exception as e:
+            self._handle_db_error(context, e)
 
-            return posts_service_pb2.LikePostResponse()
+    async def ListPosts(self, request, context):
+        try:
+            result = await self.async_db.list_posts(
+                page=request.page,
+                page_size=request.page_size,
+                user_id=request.user_id,
+                cursor=request.cursor,
+                fields=list(request.fields.paths) or None
+            )
+            return self._list_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListPostsResponse()
         except Exception as e:
             self._handle_db_error(context, e)
-            return posts_service_pb2.LikePostResponse()
+            return self.messages.ListPostsResponse()
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    posts_service_pb2_grpc.add_PostsServiceServicer_to_server(PostsService(), server)
-    server.add_insecure_port('[::]:5000')
+    async def ListPostsByTag(self, request, context):
+        try:
+            result = await self.async_db.list_posts_by_tag(
+                tags=list(request.tags),
+                match_all=request.match_all,
+                page=request.page,
+                page_size=request.page_size,
+                user_id=request.user_id,
+                cursor=request.cursor
+            )
+            return self._list_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.ListPostsResponse()
+
+    async def SearchPosts(self, request, context):
+        try:
+            result = await self.async_db.search_posts(
+                query_text=request.query,
+                page_size=request.page_size,
+                user_id=request.user_id,
+                cursor=request.cursor
+            )
+            return self._search_posts_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.SearchPostsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.SearchPostsResponse()
+
+    async def CommentPost(self, request, context):
+        try:
+            if not await self.async_db.can_access_post(request.post_id, request.creator_id):
+                context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+                context.set_details("No access to this post")
+                return self.messages.CommentPostResponse()
+
+            comment_data = await self.async_db.create_comment(
+                description=request.description,
+                post_id=request.post_id,
+                creator_id=request.creator_id,
+                events=lambda comment_data: [
+                    self._post_commented_event(request.creator_id, request.post_id, comment_data["id"])
+                ]
+            )
+
+            return self.messages.CommentPostResponse(
+                comment=self._map_to_proto_comment(comment_data)
+            )
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.CommentPostResponse()
+
+    async def ListComments(self, request, context):
+        try:
+            result = await self.async_db.list_comments(
+                post_id=request.post_id,
+                user_id=request.user_id,
+                page=request.page,
+                page_size=request.page_size,
+                cursor=request.cursor
+            )
+
+            if result is None:
+                context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+                context.set_details("No access to this post or post not found")
+                return self.messages.ListCommentsResponse()
+
+            return self._list_comments_response(result)
+        except ValueError as e:
+            self._handle_invalid_argument(context, e)
+            return self.messages.ListCommentsResponse()
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.ListCommentsResponse()
+
+    async def LikePost(self, request, context):
+        try:
+            if not await self.async_db.can_access_post(request.post_id, request.user_id):
+                context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+                context.set_details("No access to this post")
+                return self.messages.LikePostResponse()
+
+            result = await self.async_db.like_post(
+                request.post_id,
+                request.user_id,
+                events=lambda like: [self._post_liked_event(like["user_id"], like["post_id"])]
+            )
+
+            return self.messages.LikePostResponse(**result)
+        except Exception as e:
+            self._handle_db_error(context, e)
+            return self.messages.LikePostResponse()
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+def to_timestamp(value):
+    delta = value - EPOCH
+    return {"seconds": delta.days * 86400 + delta.seconds, "nanos": delta.microseconds * 1000}
+
+class PostsServiceV2Mixin:
+    messages = posts_service_v2_pb2
+
+    def _encode_timestamp(self, value):
+        return to_timestamp(value)
+
+class PostsServiceV2(PostsServiceV2Mixin, PostsService):
+    pass
+
+class AsyncPostsServiceV2(PostsServiceV2Mixin, AsyncPostsService):
+    pass
+
+def serve_threads(port=GRPC_PORT):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=GRPC_MAX_WORKERS))
+    service = PostsService()
+    service.outbox = OutboxRelay(service.db, service.kafka_producer).start()
+    posts_service_pb2_grpc.add_PostsServiceServicer_to_server(service, server)
+    posts_service_v2_pb2_grpc.add_PostsServiceServicer_to_server(
+        PostsServiceV2(service.db, service.kafka_producer, service.outbox), server
+    )
+    server.add_insecure_port(f'[::]:{port}')
     server.start()
-    print("Server started on port 5000", flush=True)
-    server.wait_for_termination()
+    print(f"Server started on port {port}", flush=True)
+    try:
+        server.wait_for_termination()
+    finally:
+        service.outbox.stop()
+        service.kafka_producer.close()
+
+async def serve_async(port=GRPC_PORT):
+    server = grpc.aio.server(migration_thread_pool=futures.ThreadPoolExecutor(max_workers=GRPC_MAX_WORKERS))
+    service = AsyncPostsService()
+    service.outbox = OutboxRelay(service.db, service.kafka_producer).start()
+    posts_service_pb2_grpc.add_PostsServiceServicer_to_server(service, server)
+    posts_service_v2_pb2_grpc.add_PostsServiceServicer_to_server(
+        AsyncPostsServiceV2(service.db, service.kafka_producer, service.async_db, service.outbox), server
+    )
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    print(f"Async server started on port {port}", flush=True)
+    try:
+        await server.wait_for_termination()
+    finally:
+        service.outbox.stop()
+        service.kafka_producer.close()
+        await service.async_db.close()
+
+def serve(mode=SERVER_MODE, port=GRPC_PORT):
+    if mode == "async":
+        asyncio.run(serve_async(port))
+    elif mode == "threads":
+        serve_threads(port)
+    else:
+        raise ValueError(f"Unknown server mode: {mode}")
 
 if __name__ == '__main__':
     serve()
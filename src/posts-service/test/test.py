@@ -1,10 +1,20 @@
 import pytest
 from database import *
-from posts_service import PostsService
+from cache import TTLCache, VisibilityIndex
+from posts_service import PostsService, AsyncPostsService, PostsServiceV2
+from outbox import OutboxRelay
+from kafka_profucer import KafkaProducer
+from confluent_kafka import KafkaException
+import asyncio
 import posts_service_pb2
 import posts_service_pb2_grpc
+import posts_service_v2_pb2
+import events_pb2
+import json
 from grpc import StatusCode
 from unittest.mock import MagicMock
+import threading
+from sqlalchemy import event
 
 @pytest.fixture(scope="function")
 def posts_service():
@@ -13,6 +23,7 @@ def posts_service():
         session.query(Comment).delete()
         session.query(PostTag).delete()
         session.query(Post).delete()
+        session.query(OutboxEvent).delete()
         session.commit()
     service = PostsService()
     service.db = db
@@ -371,6 +382,34 @@ def test_like_post(posts_service, context):
     assert context.set_code.call_count == 0
 
 
+def test_engagement_counters(posts_service, context):
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Popular", description="Content", creator_id=1, is_private=False, tags=[]
+    ), context).post
+    assert post.comment_count == 0 and post.like_count == 0
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=1), context)
+
+    for user_id in (1, 2):
+        posts_service.CommentPost(posts_service_pb2.CommentPostRequest(
+            description="Nice", post_id=post.id, creator_id=user_id
+        ), context)
+    first = posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+    repeat = posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+    other = posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=3, post_id=post.id), context)
+
+    assert (first.liked, first.like_count) == (True, 1)
+    assert (repeat.liked, repeat.like_count) == (False, 1)
+    assert (other.liked, other.like_count) == (True, 2)
+    with posts_service.db.get_session() as session:
+        liked_events = session.query(OutboxEvent).filter(OutboxEvent.payload["event_type"].astext == "post_liked").count()
+    assert liked_events == 2
+
+    fetched = posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=1), context).post
+    assert (fetched.comment_count, fetched.like_count) == (2, 2)
+    listed = posts_service.ListPosts(posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=1), context)
+    assert (listed.posts[0].comment_count, listed.posts[0].like_count) == (2, 2)
+
+
 def test_like_nonexistent_post(posts_service, context):
     like_request = posts_service_pb2.LikePostRequest(
         user_id=1,
@@ -400,3 +439,768 @@ def test_like_private_post(posts_service, context):
 
     assert context.set_code.call_count == 1
     assert context.set_code.call_args[0][0] == StatusCode.PERMISSION_DENIED
+
+
+def test_list_posts_tags_per_post(posts_service, context):
+    for i in range(3):
+        create_request = posts_service_pb2.CreatePostRequest(
+            title=f"Test Post {i}",
+            description="This is a test post",
+            creator_id=1,
+            is_private=False,
+            tags=[f"tag{i}", "common"]
+        )
+        posts_service.CreatePost(create_request, context)
+
+    list_request = posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=1)
+    list_response = posts_service.ListPosts(list_request, context)
+    assert len(list_response.posts) == 3
+    for post in list_response.posts:
+        index = post.title.split()[-1]
+        assert post.tags == [f"tag{index}", "common"]
+
+
+def test_list_posts_with_cursor(posts_service, context):
+    for i in range(15):
+        create_request = posts_service_pb2.CreatePostRequest(
+            title=f"Test Post {i}",
+            description="This is a test post",
+            creator_id=1,
+            is_private=False,
+            tags=["test"]
+        )
+        posts_service.CreatePost(create_request, context)
+
+    first_request = posts_service_pb2.ListPostsRequest(page_size=10, user_id=1)
+    first_response = posts_service.ListPosts(first_request, context)
+    assert len(first_response.posts) == 10
+    assert first_response.next_cursor
+
+    second_request = posts_service_pb2.ListPostsRequest(
+        page_size=10,
+        user_id=1,
+        cursor=first_response.next_cursor
+    )
+    second_response = posts_service.ListPosts(second_request, context)
+    assert len(second_response.posts) == 5
+    assert second_response.next_cursor == ""
+
+    titles = [post.title for post in first_response.posts] + [post.title for post in second_response.posts]
+    assert titles == [f"Test Post {i}" for i in reversed(range(15))]
+    assert context.set_code.call_count == 0
+
+
+def test_list_posts_with_invalid_cursor(posts_service, context):
+    list_request = posts_service_pb2.ListPostsRequest(page_size=10, user_id=1, cursor="not-a-cursor")
+    posts_service.ListPosts(list_request, context)
+    assert context.set_code.call_count == 1
+    assert context.set_code.call_args[0][0] == StatusCode.INVALID_ARGUMENT
+
+
+def test_list_comments_with_cursor(posts_service, context):
+    post_request = posts_service_pb2.CreatePostRequest(
+        title="Post for cursor pagination",
+        description="Content",
+        creator_id=1,
+        is_private=False,
+        tags=[]
+    )
+    post = posts_service.CreatePost(post_request, context).post
+
+    for i in range(7):
+        comment_request = posts_service_pb2.CommentPostRequest(
+            description=f"Comment {i}",
+            post_id=post.id,
+            creator_id=1
+        )
+        posts_service.CommentPost(comment_request, context)
+
+    seen = []
+    cursor = ""
+    while True:
+        list_request = posts_service_pb2.ListCommentsRequest(
+            post_id=post.id,
+            page_size=3,
+            user_id=1,
+            cursor=cursor
+        )
+        response = posts_service.ListComments(list_request, context)
+        seen.extend(comment.description for comment in response.comments)
+        cursor = response.next_cursor
+        if not cursor:
+            break
+
+    assert seen == [f"Comment {i}" for i in reversed(range(7))]
+
+
+def test_list_posts_cached_totals(posts_service, context):
+    posts_service.db = PostsDB(totals_mode="cached", totals_cache_ttl=60)
+    create_request = posts_service_pb2.CreatePostRequest(
+        title="Test Post",
+        description="This is a test post",
+        creator_id=1,
+        is_private=False,
+        tags=["test"]
+    )
+    posts_service.CreatePost(create_request, context)
+
+    list_request = posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=1)
+    list_response = posts_service.ListPosts(list_request, context)
+    assert list_response.total == 1
+    assert list_response.totals_mode == posts_service_pb2.TOTALS_MODE_CACHED
+
+    posts_service.CreatePost(create_request, context)
+    list_response = posts_service.ListPosts(list_request, context)
+    assert list_response.total == 2
+
+
+def test_list_posts_estimated_totals(posts_service, context):
+    posts_service.db = PostsDB(totals_mode="estimated")
+    list_request = posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=1)
+    list_response = posts_service.ListPosts(list_request, context)
+    assert list_response.totals_mode == posts_service_pb2.TOTALS_MODE_ESTIMATED
+    assert list_response.total >= 0
+    assert context.set_code.call_count == 0
+
+
+def test_list_comments_cached_totals(posts_service, context):
+    posts_service.db = PostsDB(totals_mode="cached", totals_cache_ttl=60)
+    post_request = posts_service_pb2.CreatePostRequest(
+        title="Post with comments",
+        description="Content",
+        creator_id=1,
+        is_private=False,
+        tags=[]
+    )
+    post = posts_service.CreatePost(post_request, context).post
+    list_request = posts_service_pb2.ListCommentsRequest(post_id=post.id, page=1, page_size=10, user_id=1)
+
+    for i in range(2):
+        comment_request = posts_service_pb2.CommentPostRequest(
+            description=f"Comment {i}",
+            post_id=post.id,
+            creator_id=1
+        )
+        posts_service.CommentPost(comment_request, context)
+        response = posts_service.ListComments(list_request, context)
+        assert response.total == i + 1
+        assert response.totals_mode == posts_service_pb2.TOTALS_MODE_CACHED
+
+
+def test_get_post_served_from_cache(posts_service, context):
+    create_request = posts_service_pb2.CreatePostRequest(
+        title="Private Post",
+        description="This is a private post",
+        creator_id=1,
+        is_private=True,
+        tags=["private"]
+    )
+    post_id = posts_service.CreatePost(create_request, context).post.id
+
+    for _ in range(3):
+        get_response = posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post_id, user_id=1), context)
+        assert get_response.post.title == "Private Post"
+    assert posts_service.db.post_cache.stats()["hits"] == 3
+
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post_id, user_id=2), context)
+    context.set_code.assert_called_with(StatusCode.NOT_FOUND)
+
+
+def test_update_post_invalidates_cache(posts_service, context):
+    create_request = posts_service_pb2.CreatePostRequest(
+        title="Test Post",
+        description="This is a test post",
+        creator_id=1,
+        is_private=False,
+        tags=["test"]
+    )
+    post_id = posts_service.CreatePost(create_request, context).post.id
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post_id, user_id=2), context)
+
+    update_request = posts_service_pb2.UpdatePostRequest(
+        id=post_id,
+        title="Updated Post",
+        description="This is an updated test post",
+        is_private=True,
+        user_id=1,
+        tags=["updated"]
+    )
+    posts_service.UpdatePost(update_request, context)
+
+    get_response = posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post_id, user_id=1), context)
+    assert get_response.post.title == "Updated Post"
+    assert get_response.post.tags == ["updated"]
+
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post_id, user_id=2), context)
+    context.set_code.assert_called_with(StatusCode.NOT_FOUND)
+
+    posts_service.DeletePost(posts_service_pb2.DeletePostRequest(id=post_id, user_id=1), context)
+    assert posts_service.db.get_post(post_id, 1) is None
+
+
+def test_get_metrics(posts_service, context):
+    response = posts_service.GetMetrics(posts_service_pb2.GetMetricsRequest(), context)
+    assert "post_cache.size" in response.metrics
+    assert "post_cache.hit_rate" in response.metrics
+    assert "post_cache.evictions" in response.metrics
+    assert "db_pool.checked_out" in response.metrics
+    assert "db_pool.wait_ms_bucket.le_inf" in response.metrics
+    assert response.metrics["db_pool.timeouts"] == 0
+
+
+def test_db_pool_records_waits_and_timeouts():
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from db_pool import create_instrumented_engine, pool_stats
+
+    engine = create_instrumented_engine(DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    try:
+        connection = engine.connect()
+        assert pool_stats(engine)["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        connection.close()
+
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["timeouts"] == 1
+        assert stats["wait_count"] == 2
+        assert stats["wait_ms_bucket.le_inf"] == 2
+        assert stats["wait_max_ms"] >= 50
+    finally:
+        engine.dispose()
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_like_and_comment_use_visibility_index(posts_service, context):
+    post_request = posts_service_pb2.CreatePostRequest(
+        title="Private post",
+        description="Secret content",
+        creator_id=1,
+        is_private=True,
+        tags=[]
+    )
+    post = posts_service.CreatePost(post_request, context).post
+
+    posts_service.db.visibility_index.clear()
+    assert posts_service.db.can_access_post(post.id, 1) is True
+    assert posts_service.db.can_access_post(post.id, 2) is False
+    assert posts_service.db.can_access_post(post.id, 1) is True
+    stats = posts_service.db.visibility_index.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+    update_request = posts_service_pb2.UpdatePostRequest(
+        id=post.id,
+        title="Public post",
+        description="Open content",
+        is_private=False,
+        user_id=1,
+        tags=[]
+    )
+    posts_service.UpdatePost(update_request, context)
+    posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+    assert context.set_code.call_count == 0
+
+    posts_service.DeletePost(posts_service_pb2.DeletePostRequest(id=post.id, user_id=1), context)
+    posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+    context.set_code.assert_called_with(StatusCode.PERMISSION_DENIED)
+
+
+def test_stale_read_does_not_repopulate_visibility_index(posts_service, context):
+    db = posts_service.db
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Soon private", description="", creator_id=1, is_private=False, tags=[]
+    ), context).post
+    db.visibility_index.clear()
+
+    load_tags = db._load_tags
+    def flip_privacy_mid_read(session, post_ids):
+        db.update_post(post.id, "Soon private", "", True, 1, [])
+        return load_tags(session, post_ids)
+    db._load_tags = flip_privacy_mid_read
+    db._load_posts([post.id])
+    db._load_tags = load_tags
+
+    assert db.visibility_index.get(post.id) == (True, 1)
+    assert db.can_access_post(post.id, 2) is False
+
+
+def test_visibility_index_entries_expire():
+    index = VisibilityIndex(10, ttl=0)
+    index.set(1, False, 7)
+    assert index.get(1) is None
+
+    index = VisibilityIndex(10, ttl=60)
+    generation = index.generation
+    index.invalidate(1)
+    index.set(1, False, 7, generation)
+    assert index.get(1) is None
+    index.set(1, True, 7)
+    assert index.get(1) == (True, 7)
+
+
+def test_batch_get_posts(posts_service, context):
+    public_request = posts_service_pb2.CreatePostRequest(
+        title="Public Post",
+        description="Content",
+        creator_id=1,
+        is_private=False,
+        tags=["public"]
+    )
+    private_request = posts_service_pb2.CreatePostRequest(
+        title="Private Post",
+        description="Content",
+        creator_id=1,
+        is_private=True,
+        tags=["private"]
+    )
+    public_id = posts_service.CreatePost(public_request, context).post.id
+    private_id = posts_service.CreatePost(private_request, context).post.id
+    posts_service.db.post_cache.clear()
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=public_id, user_id=2), context)
+
+    batch_request = posts_service_pb2.BatchGetPostsRequest(ids=[private_id, 999, public_id], user_id=2)
+    response = posts_service.BatchGetPosts(batch_request, context)
+
+    assert [item.id for item in response.items] == [private_id, 999, public_id]
+    assert [item.found for item in response.items] == [False, False, True]
+    assert response.items[2].post.title == "Public Post"
+    assert response.items[2].post.tags == ["public"]
+
+    batch_request = posts_service_pb2.BatchGetPostsRequest(ids=[private_id, public_id], user_id=1)
+    response = posts_service.BatchGetPosts(batch_request, context)
+    assert [item.post.title for item in response.items] == ["Private Post", "Public Post"]
+    assert context.set_code.call_count == 0
+
+
+def test_batch_get_posts_too_many_ids(posts_service, context):
+    batch_request = posts_service_pb2.BatchGetPostsRequest(ids=list(range(1, 1000)), user_id=1)
+    posts_service.BatchGetPosts(batch_request, context)
+    context.set_code.assert_called_with(StatusCode.INVALID_ARGUMENT)
+
+
+def test_stream_posts(posts_service, context):
+    for i in range(5):
+        create_request = posts_service_pb2.CreatePostRequest(
+            title=f"Test Post {i}",
+            description="This is a test post",
+            creator_id=1,
+            is_private=i == 4,
+            tags=[f"tag{i}"]
+        )
+        posts_service.CreatePost(create_request, context)
+
+    stream_request = posts_service_pb2.StreamPostsRequest(user_id=2, chunk_size=2)
+    posts = list(posts_service.StreamPosts(stream_request, context))
+    assert [post.title for post in posts] == [f"Test Post {i}" for i in range(4)]
+    assert [list(post.tags) for post in posts] == [[f"tag{i}"] for i in range(4)]
+
+    stream_request = posts_service_pb2.StreamPostsRequest(user_id=1)
+    assert len(list(posts_service.StreamPosts(stream_request, context))) == 5
+    assert context.set_code.call_count == 0
+
+
+def test_events_are_written_to_outbox_and_relayed(posts_service, context):
+    posts_service.kafka_producer = MagicMock()
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Outbox", description="Content", creator_id=1, is_private=False, tags=[]
+    ), context).post
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=2), context)
+    posts_service.CommentPost(posts_service_pb2.CommentPostRequest(
+        description="Nice", post_id=post.id, creator_id=2
+    ), context)
+    posts_service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+
+    def failing_events(comment_data):
+        raise RuntimeError("event serialization failed")
+
+    with pytest.raises(RuntimeError):
+        posts_service.db.create_comment("Lost", post.id, 3, events=failing_events)
+    with posts_service.db.get_session() as session:
+        assert session.query(Comment).filter(Comment.creator_id == 3).count() == 0
+    posts_service.kafka_producer.produce.assert_not_called()
+
+    producer = MagicMock()
+    relay = OutboxRelay(posts_service.db, producer, batch_size=3)
+    assert relay.relay_once() == 3
+    assert relay.relay_once() == 1
+    assert relay.relay_once() == 0
+
+    published = [(call.args[0], key, value["event_type"])
+                 for call in producer.produce_batch.call_args_list for key, value in call.args[1]]
+    assert published == [
+        ("post-events", str(post.id), "post_created"),
+        ("post-interactions", f"2-{post.id}", "post_viewed"),
+        ("post-interactions", f"2-{post.id}", "post_commented"),
+        ("post-interactions", f"2-{post.id}", "post_liked")
+    ]
+    assert relay.stats() == {"published": 4, "batches": 2, "errors": 0}
+    with posts_service.db.get_session() as session:
+        assert session.query(OutboxEvent).count() == 0
+
+
+def test_async_producer_tracks_delivery_and_applies_backpressure():
+    class BoundedProducer:
+        def __init__(self, capacity):
+            self.capacity = capacity
+            self.queue = []
+            self.lock = threading.Lock()
+
+        def produce(self, topic, key, value, headers, on_delivery):
+            with self.lock:
+                if len(self.queue) >= self.capacity:
+                    raise BufferError("queue full")
+                self.queue.append((key, on_delivery))
+
+        def poll(self, timeout=0):
+            with self.lock:
+                delivered, self.queue = self.queue, []
+            for key, on_delivery in delivered:
+                on_delivery("broker down" if key == "bad" else None, None)
+            return len(delivered)
+
+        def flush(self, timeout=None):
+            self.poll()
+            return 0
+
+        def __len__(self):
+            return len(self.queue)
+
+    producer = KafkaProducer(BoundedProducer(capacity=2), mode="async", event_format="json", queue_timeout=1)
+    try:
+        for i in range(3):
+            producer.produce("post-events", str(i), {"i": i})
+        producer.produce_batch("post-events", [(str(i), {"i": i}) for i in range(3, 6)])
+        with pytest.raises(KafkaException):
+            producer.produce_batch("post-events", [("ok", {}), ("bad", {})])
+    finally:
+        assert producer.close() == 0
+    assert producer.stats() == {"produced": 7, "failed": 1, "queued": 0}
+
+    with pytest.raises(BufferError):
+        KafkaProducer(BoundedProducer(capacity=0), mode="sync", event_format="json", queue_timeout=0) \
+            .produce("post-events", "1", {})
+
+
+def test_events_are_encoded_as_protobuf(posts_service):
+    producer = MagicMock()
+    producer.flush.return_value = 0
+    posts_service.kafka_producer = KafkaProducer(producer, mode="sync", event_format="protobuf")
+    _, key, value = posts_service._post_created_event({
+        "id": 5, "creator_id": 2, "is_private": True, "created_at": datetime.datetime(2024, 1, 2, 3, 4, 5, 6000)
+    })
+    posts_service.kafka_producer.produce("post-events", key, value)
+
+    call = producer.produce.call_args.kwargs
+    assert call["headers"] == [("schema-version", b"2")]
+    event = events_pb2.Event.FromString(call["value"])
+    assert event.WhichOneof("payload") == "post_created"
+    assert event.post_created == events_pb2.PostCreated(
+        post_id=5, creator_id=2, created_at=1704164645006, is_private=True, event_id=value["event_id"]
+    )
+    assert len(call["value"]) < len(json.dumps(value))
+
+
+def test_bulk_create_posts(posts_service, context):
+    requests = [
+        posts_service_pb2.CreatePostRequest(
+            title=f"Bulk Post {i}",
+            description="Imported post",
+            creator_id=1,
+            is_private=i % 2 == 0,
+            tags=[f"tag{i}", "imported"]
+        ) for i in range(5)
+    ]
+    response = posts_service.BulkCreatePosts(iter(requests), context)
+
+    assert response.created == 5
+    assert response.failed == 0
+    assert [result.index for result in response.results] == list(range(5))
+    assert [result.post.title for result in response.results] == [f"Bulk Post {i}" for i in range(5)]
+
+    post = response.results[3].post
+    get_response = posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=1), context)
+    assert get_response.post.tags == ["tag3", "imported"]
+
+    posts_service.db.post_cache.clear()
+    get_response = posts_service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=1), context)
+    assert get_response.post.tags == ["tag3", "imported"]
+
+    list_request = posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=2)
+    assert posts_service.ListPosts(list_request, context).total == 2
+    assert context.set_code.call_count == 0
+
+
+def test_async_service_read_path(posts_service, context):
+    create_request = posts_service_pb2.CreatePostRequest(
+        title="Async Post",
+        description="Served by the async server",
+        creator_id=1,
+        is_private=True,
+        tags=["async"]
+    )
+    post = posts_service.CreatePost(create_request, context).post
+
+    async def run():
+        service = AsyncPostsService()
+        try:
+            get_response = await service.GetPost(posts_service_pb2.GetPostRequest(id=post.id, user_id=1), context)
+            list_response = await service.ListPosts(
+                posts_service_pb2.ListPostsRequest(page=1, page_size=10, user_id=1), context
+            )
+            comment_response = await service.CommentPost(
+                posts_service_pb2.CommentPostRequest(description="Comment", post_id=post.id, creator_id=1), context
+            )
+            streamed = [streamed_post async for streamed_post in service.StreamPosts(
+                posts_service_pb2.StreamPostsRequest(user_id=1), context
+            )]
+            await service.LikePost(posts_service_pb2.LikePostRequest(user_id=2, post_id=post.id), context)
+            return get_response, list_response, comment_response, streamed
+        finally:
+            await service.async_db.close()
+
+    get_response, list_response, comment_response, streamed = asyncio.run(run())
+    assert get_response.post.tags == ["async"]
+    assert list_response.total == 1
+    assert comment_response.comment.description == "Comment"
+    assert [streamed_post.title for streamed_post in streamed] == ["Async Post"]
+    context.set_code.assert_called_once_with(StatusCode.PERMISSION_DENIED)
+
+
+def test_migrations_are_applied_once(posts_service):
+    from migrations import migrate, MIGRATIONS, MIGRATIONS_TABLE
+
+    assert posts_service.db.schema_version == MIGRATIONS[-1][0]
+    assert migrate(posts_service.db.engine) == MIGRATIONS[-1][0]
+    with posts_service.db.get_session() as session:
+        versions = session.connection().exec_driver_sql(f"SELECT version FROM {MIGRATIONS_TABLE}").scalars().all()
+    assert sorted(versions) == [version for version, _, _ in MIGRATIONS]
+
+
+def test_listing_queries_use_hot_path_indexes(posts_service, context):
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Indexed", description="Post", creator_id=1, is_private=False, tags=["a"]
+    ), context).post
+    db = posts_service.db
+
+    with db.get_session() as session:
+        for setting in ("enable_seqscan", "enable_sort"):
+            session.connection().exec_driver_sql(f"SET LOCAL {setting} = off")
+        posts_query = page_query(db.visible_posts_query(session, 1), Post.created_at, Post.id, None, 10,
+                                 encode_cursor(datetime.datetime.now(), post.id))
+        tags_query = session.query(PostTag.name).filter(PostTag.post_id.in_([post.id])) \
+            .order_by(PostTag.post_id, PostTag.id)
+        comments_query = page_query(session.query(Comment).filter(Comment.post_id == post.id),
+                                    Comment.created_at, Comment.id, 1, 10)
+
+        assert "ix_posts_created_at_id" in plan_indexes(explain(session, posts_query.statement))
+        assert "ix_posts_tags_post_id" in plan_indexes(explain(session, tags_query.statement))
+        assert "ix_comments_post_created_at_id" in plan_indexes(explain(session, comments_query.statement))
+
+
+def test_list_posts_by_tag(posts_service, context):
+    def create(title, tags, creator_id=1, is_private=False):
+        return posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+            title=title, description="Tagged", creator_id=creator_id, is_private=is_private, tags=tags
+        ), context).post.id
+
+    create("Both", ["python", "grpc"])
+    python_only = create("Python", ["python"])
+    create("Grpc", ["grpc"])
+    create("Private", ["python", "grpc"], creator_id=2, is_private=True)
+
+    def titles(tags, match_all, user_id=1):
+        response = posts_service.ListPostsByTag(posts_service_pb2.ListPostsByTagRequest(
+            tags=tags, match_all=match_all, page=1, page_size=10, user_id=user_id
+        ), context)
+        return {post.title for post in response.posts}, response.total
+
+    assert titles(["python"], False) == ({"Both", "Python"}, 2)
+    assert titles(["python", "grpc"], False) == ({"Both", "Python", "Grpc"}, 3)
+    assert titles(["python", "grpc"], True) == ({"Both"}, 1)
+    assert titles(["python", "grpc"], True, user_id=2) == ({"Both", "Private"}, 2)
+    assert titles(["python", "missing"], True) == (set(), 0)
+    assert titles(["missing"], False) == (set(), 0)
+
+    posts_service.UpdatePost(posts_service_pb2.UpdatePostRequest(
+        id=python_only, title="Python", description="Tagged", is_private=False, user_id=1, tags=["grpc"]
+    ), context)
+    assert titles(["python"], False) == ({"Both"}, 1)
+
+
+def test_list_posts_by_tag_cached_totals(posts_service, context):
+    posts_service.db = PostsDB(totals_mode="cached", totals_cache_ttl=60)
+
+    def create():
+        return posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+            title="Tagged", description="Tagged", creator_id=1, is_private=False, tags=["cached"]
+        ), context).post.id
+
+    def total():
+        return posts_service.ListPostsByTag(posts_service_pb2.ListPostsByTagRequest(
+            tags=["cached"], page=1, page_size=10, user_id=1
+        ), context).total
+
+    first = create()
+    assert total() == 1
+    second = create()
+    assert total() == 2
+
+    posts_service.UpdatePost(posts_service_pb2.UpdatePostRequest(
+        id=first, title="Tagged", description="Tagged", is_private=False, user_id=1, tags=["other"]
+    ), context)
+    assert total() == 1
+
+    posts_service.DeletePost(posts_service_pb2.DeletePostRequest(id=second, user_id=1), context)
+    assert total() == 0
+
+
+def test_list_posts_by_tag_requires_tags(posts_service, context):
+    posts_service.ListPostsByTag(posts_service_pb2.ListPostsByTagRequest(page=1, page_size=10, user_id=1), context)
+    context.set_code.assert_called_with(StatusCode.INVALID_ARGUMENT)
+
+
+def test_tags_are_deduplicated_on_write(posts_service, context):
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Dup", description="Tags", creator_id=1, is_private=False, tags=["a", "b", "a"]
+    ), context).post
+    assert list(post.tags) == ["a", "b"]
+
+    updated = posts_service.UpdatePost(posts_service_pb2.UpdatePostRequest(
+        id=post.id, title="Dup", description="Tags", is_private=False, user_id=1, tags=["c", "c", "a"]
+    ), context).post
+    assert list(updated.tags) == ["c", "a"]
+
+    created = posts_service.db.create_posts([{
+        "title": "Bulk", "description": "Tags", "creator_id": 1, "is_private": False, "tags": ["x", "x"]
+    }])
+    assert created[0]["tags"] == ["x"]
+
+    with posts_service.db.get_session() as session:
+        rows = session.query(PostTag.name, PostTag.tag_id).filter(PostTag.post_id == post.id).all()
+    assert sorted(name for name, _ in rows) == ["a", "c"]
+    assert all(tag_id is not None for _, tag_id in rows)
+
+
+def test_search_posts(posts_service, context):
+    def create(title, description, creator_id=1, is_private=False):
+        return posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+            title=title, description=description, creator_id=creator_id, is_private=is_private, tags=[]
+        ), context).post.id
+
+    title_match = create("Kafka consumers", "Notes on batching")
+    description_match = create("Streaming notes", "How kafka consumer groups rebalance")
+    create("Unrelated", "Nothing to see here")
+    create("Private kafka", "Kafka internals", creator_id=2, is_private=True)
+
+    def search(query, user_id=1, page_size=10, cursor=""):
+        return posts_service.SearchPosts(posts_service_pb2.SearchPostsRequest(
+            query=query, page_size=page_size, user_id=user_id, cursor=cursor
+        ), context)
+
+    response = search("kafka consumer")
+    assert [post.id for post in response.posts] == [title_match, description_match]
+    assert len(search("kafka", user_id=2).posts) == 3
+
+    first = search("kafka", page_size=1)
+    second = search("kafka", page_size=1, cursor=first.next_cursor)
+    assert first.next_cursor and not second.next_cursor
+    assert {first.posts[0].id, second.posts[0].id} == {title_match, description_match}
+
+    posts_service.UpdatePost(posts_service_pb2.UpdatePostRequest(
+        id=description_match, title="Streaming notes", description="Rebalancing", is_private=False, user_id=1, tags=[]
+    ), context)
+    assert [post.id for post in search("kafka").posts] == [title_match]
+
+
+def test_search_posts_pages_through_tied_ranks(posts_service, context):
+    post_ids = [posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title=f"Kafka {i}", description="", creator_id=1, is_private=False, tags=[]
+    ), context).post.id for i in range(5)]
+
+    seen, cursor = [], ""
+    while True:
+        response = posts_service.SearchPosts(posts_service_pb2.SearchPostsRequest(
+            query="kafka", page_size=2, user_id=1, cursor=cursor
+        ), context)
+        seen += [post.id for post in response.posts]
+        cursor = response.next_cursor
+        if not cursor:
+            break
+    assert seen == sorted(post_ids, reverse=True)
+
+
+def test_search_posts_requires_query(posts_service, context):
+    posts_service.SearchPosts(posts_service_pb2.SearchPostsRequest(query=" ", page_size=10, user_id=1), context)
+    context.set_code.assert_called_with(StatusCode.INVALID_ARGUMENT)
+
+
+def test_v2_messages_use_timestamps(posts_service, context):
+    service_v2 = PostsServiceV2(posts_service.db, posts_service.kafka_producer)
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Binary", description="Timestamps", creator_id=1, is_private=False, tags=["v2"]
+    ), context).post
+    posts_service.CommentPost(posts_service_pb2.CommentPostRequest(
+        description="Comment", post_id=post.id, creator_id=1
+    ), context)
+
+    fetched = service_v2.GetPost(posts_service_v2_pb2.GetPostRequest(id=post.id, user_id=1), context).post
+    assert isinstance(fetched, posts_service_v2_pb2.Post)
+    assert fetched.created_at.ToDatetime() == datetime.datetime.fromisoformat(post.created_at)
+    assert (fetched.id, list(fetched.tags), fetched.comment_count) == (post.id, ["v2"], 1)
+
+    listed = service_v2.ListPosts(posts_service_v2_pb2.ListPostsRequest(page=1, page_size=10, user_id=1), context)
+    assert [p.id for p in listed.posts] == [post.id]
+    assert listed.totals_mode == posts_service_v2_pb2.TOTALS_MODE_EXACT
+
+    comments = service_v2.ListComments(posts_service_v2_pb2.ListCommentsRequest(
+        page=1, page_size=10, user_id=1, post_id=post.id
+    ), context)
+    assert comments.comments[0].created_at.ToDatetime() <= datetime.datetime.now()
+
+    batch = service_v2.BatchGetPosts(posts_service_v2_pb2.BatchGetPostsRequest(ids=[post.id, 2 ** 40], user_id=1), context)
+    assert [item.found for item in batch.items] == [True, False]
+    assert context.set_code.call_count == 0
+
+
+def test_field_masks_limit_columns_and_fields(posts_service, context):
+    from google.protobuf.field_mask_pb2 import FieldMask
+
+    post = posts_service.CreatePost(posts_service_pb2.CreatePostRequest(
+        title="Masked", description="Long body", creator_id=1, is_private=False, tags=["t"]
+    ), context).post
+    statements = []
+    event.listen(posts_service.db.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    listed = posts_service.ListPosts(posts_service_pb2.ListPostsRequest(
+        page_size=10, user_id=1, fields=FieldMask(paths=["id", "title"])
+    ), context)
+    assert [(p.id, p.title, p.description, list(p.tags)) for p in listed.posts] == [(post.id, "Masked", "", [])]
+    assert not any("description" in statement or "posts_tags" in statement for statement in statements)
+
+    posts_service.db.post_cache.clear()
+    fetched = posts_service.GetPost(posts_service_pb2.GetPostRequest(
+        id=post.id, user_id=1, fields=FieldMask(paths=["tags", "created_at"])
+    ), context).post
+    assert (fetched.id, fetched.title, list(fetched.tags)) == (0, "", ["t"])
+    assert fetched.created_at == post.created_at
+    assert len(posts_service.db.post_cache) == 0
+
+    posts_service.GetPost(posts_service_pb2.GetPostRequest(
+        id=post.id, user_id=1, fields=FieldMask(paths=["password"])
+    ), context)
+    context.set_code.assert_called_with(StatusCode.INVALID_ARGUMENT)
+
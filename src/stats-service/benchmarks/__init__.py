@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+import time
+
+from database import StatsDB
+from migrations import migrate
+
+
+@contextmanager
+def scratch_db(prefix):
+    # benchmarks seed synthetic events, which must never reach the live rollups
+    admin = StatsDB()
+    database = f"{prefix}_{int(time.time())}"
+    admin.client.execute(f"CREATE DATABASE {database}")
+    try:
+        db = StatsDB(database=database)
+        migrate(db.client)
+        yield db
+    finally:
+        admin.client.execute(f"DROP DATABASE IF EXISTS {database} SYNC")
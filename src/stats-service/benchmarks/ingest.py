@@ -0,0 +1,95 @@
+import time
+
+import events_pb2
+from database import StatsDB
+from kafka_consumer import EventIngestor, EVENT_TYPES, decode_event
+
+MESSAGES = 5000
+INSERT_OVERHEAD = 0.001
+ROW_COST = 0.000001
+BATCH_SIZES = [100, 1000, 10000]
+
+
+class FakeClient:
+    def __init__(self):
+        self.inserts = 0
+        self.rows = 0
+
+    def execute(self, query, params=None, columnar=False, settings=None):
+        if not query.startswith("INSERT"):
+            return [(0,)]
+        rows = len(params[0]) if columnar else len(params)
+        time.sleep(INSERT_OVERHEAD + ROW_COST * rows)
+        self.inserts += 1
+        self.rows += rows
+        return rows
+
+
+class FakeMessage:
+    def __init__(self, value, headers):
+        self._value = value
+        self._headers = headers
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+
+class FakeConsumer:
+    def __init__(self, messages):
+        self.messages = iter(messages)
+        self.commits = 0
+
+    def poll(self, timeout):
+        return next(self.messages, None)
+
+    def commit(self, asynchronous=True):
+        self.commits += 1
+
+
+def make_messages():
+    headers = [("schema-version", b"2")]
+    return [FakeMessage(events_pb2.Event(post_viewed=events_pb2.PostViewed(
+        user_id=i % 1000, post_id=i % 100, timestamp=1704164645000 + i, event_id=f"view-{i}"
+    )).SerializeToString(), headers) for i in range(MESSAGES)]
+
+
+def bench_per_message(messages):
+    client = FakeClient()
+    db = StatsDB(client=client)
+    start = time.perf_counter()
+    for msg in messages:
+        event_type, event = decode_event(msg.value(), msg.headers())
+        db.insert_event(event_type=EVENT_TYPES[event_type], **event)
+    return time.perf_counter() - start, client.inserts, "auto"
+
+
+def bench_batched(messages, batch_size):
+    client = FakeClient()
+    consumer = FakeConsumer(messages)
+    ingestor = EventIngestor(StatsDB(client=client), consumer, batch_size=batch_size, flush_interval=60)
+    start = time.perf_counter()
+    for _ in messages:
+        ingestor.poll()
+    ingestor.flush()
+    return time.perf_counter() - start, client.inserts, consumer.commits
+
+
+def main():
+    messages = make_messages()
+    print(f"{MESSAGES} events, {INSERT_OVERHEAD * 1000:.0f} ms per INSERT")
+    print(f"{'mode':>12} {'seconds':>8} {'events/s':>10} {'inserts':>8} {'commits':>8}")
+    elapsed, inserts, commits = bench_per_message(messages)
+    print(f"{'per message':>12} {elapsed:>8.3f} {MESSAGES / elapsed:>10.0f} {inserts:>8} {commits:>8}")
+    for batch_size in BATCH_SIZES:
+        elapsed, inserts, commits = bench_batched(messages, batch_size)
+        print(f"{f'batch {batch_size}':>12} {elapsed:>8.3f} {MESSAGES / elapsed:>10.0f} {inserts:>8} {commits:>8}")
+
+
+if __name__ == "__main__":
+    main()
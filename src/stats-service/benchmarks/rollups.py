@@ -0,0 +1,81 @@
+import datetime
+import statistics
+import time
+
+from benchmarks import scratch_db
+
+VOLUMES = [10000, 100000, 1000000, 3000000]
+DAYS = 30
+CHUNK_SIZE = 100000
+REPEATS = 10
+BENCH_POST_ID = 10 ** 12
+
+
+def raw_post_stats(db, post_id):
+    return db.client.execute("""
+        SELECT
+            sum(event_type = 'view') AS views,
+            sum(event_type = 'like') AS likes,
+            sum(event_type = 'comment') AS comments
+        FROM post_events FINAL
+        WHERE post_id = %(post_id)s
+    """, {'post_id': post_id})
+
+
+def raw_post_dynamics(db, post_id):
+    return db.client.execute("""
+        SELECT
+            toDate(event_time) AS ts,
+            sum(event_type = 'view') AS views,
+            sum(event_type = 'like') AS likes,
+            sum(event_type = 'comment') AS comments
+        FROM post_events FINAL
+        WHERE post_id = %(post_id)s
+        GROUP BY ts
+        ORDER BY ts
+    """, {'post_id': post_id})
+
+
+def seed(db, post_id, start, count):
+    first_day = datetime.datetime(2024, 1, 1)
+    event_types = ["view"] * 8 + ["like", "comment"]
+    for offset in range(start, start + count, CHUNK_SIZE):
+        ids = range(offset, min(offset + CHUNK_SIZE, start + count))
+        db.insert_events([
+            [first_day + datetime.timedelta(days=i % DAYS, seconds=i % 86400) for i in ids],
+            [post_id] * len(ids),
+            [i % 5000 for i in ids],
+            [event_types[i % len(event_types)] for i in ids],
+            [f"bench-{post_id}-{i}" for i in ids]
+        ])
+
+
+def measure(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(db):
+    post_id = BENCH_POST_ID
+    print(f"{'events':>8} {'raw stats ms':>13} {'rollup stats ms':>16} {'raw dynamics ms':>16} {'rollup dynamics ms':>19}")
+    current = 0
+    for volume in VOLUMES:
+        seed(db, post_id, current, volume - current)
+        current = volume
+        print(f"{volume:>8} {measure(raw_post_stats, db, post_id):>13.2f} "
+              f"{measure(db.get_post_stats, post_id):>16.2f} "
+              f"{measure(raw_post_dynamics, db, post_id):>16.2f} "
+              f"{measure(db.get_post_dynamics, post_id):>19.2f}")
+
+
+def main():
+    with scratch_db("bench_rollups") as db:
+        run(db)
+
+
+if __name__ == "__main__":
+    main()
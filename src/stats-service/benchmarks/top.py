@@ -0,0 +1,72 @@
+import datetime
+import statistics
+import time
+
+from benchmarks import scratch_db
+
+VOLUMES = [100000, 1000000]
+POSTS = 10000
+USERS = 5000
+HOURS = 24 * 7
+CHUNK_SIZE = 100000
+REPEATS = 10
+LIMIT = 10
+
+
+def raw_top_posts(db, hours):
+    window = "AND event_time >= toStartOfHour(now()) - INTERVAL %(hours)s HOUR" if hours else ""
+    return db.client.execute(f"""
+        SELECT post_id, count() AS cnt
+        FROM post_events FINAL
+        WHERE event_type = 'view' {window}
+        GROUP BY post_id
+        ORDER BY cnt DESC, post_id
+        LIMIT %(limit)s
+    """, {'hours': hours, 'limit': LIMIT})
+
+
+def seed(db, prefix, start, count):
+    now = datetime.datetime.now().replace(microsecond=0)
+    event_types = ["view"] * 8 + ["like", "comment"]
+    for offset in range(start, start + count, CHUNK_SIZE):
+        ids = range(offset, min(offset + CHUNK_SIZE, start + count))
+        db.insert_events([
+            [now - datetime.timedelta(hours=i % HOURS, seconds=i % 3600) for i in ids],
+            [(i * 7919) % POSTS for i in ids],
+            [i % USERS for i in ids],
+            [event_types[i % len(event_types)] for i in ids],
+            [f"{prefix}-{i}" for i in ids]
+        ])
+
+
+def measure(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(db):
+    prefix = f"bench-top-{int(time.time())}"
+    print(f"{'events':>8} {'window':>7} {'raw ms':>8} {'rollup ms':>10} {'match':>6}")
+    current = 0
+    for volume in VOLUMES:
+        seed(db, prefix, current, volume - current)
+        current = volume
+        for window, hours in (("all", 0), ("day", 24), ("hour", 1)):
+            match = [tuple(row) for row in raw_top_posts(db, hours)] == [
+                (p["post_id"], p["count"]) for p in db.get_top_posts("post_viewed", LIMIT, window)
+            ]
+            print(f"{volume:>8} {window:>7} {measure(raw_top_posts, db, hours):>8.2f} "
+                  f"{measure(db.get_top_posts, 'post_viewed', LIMIT, window):>10.2f} {'yes' if match else 'no':>6}")
+
+
+def main():
+    with scratch_db("bench_top") as db:
+        run(db)
+
+
+if __name__ == "__main__":
+    main()
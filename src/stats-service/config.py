@@ -0,0 +1,12 @@
+import os
+
+KAFKA_BROKER = os.getenv("KAFKA_BROKER", "kafka:9092")
+
+INGEST_BATCH_SIZE = int(os.getenv("STATS_INGEST_BATCH_SIZE", "10000"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("STATS_INGEST_FLUSH_INTERVAL", "1"))
+INGEST_RETRY_INTERVAL = float(os.getenv("STATS_INGEST_RETRY_INTERVAL", "1"))
+INGEST_WORKERS = int(os.getenv("STATS_INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+TOP_DEFAULT_LIMIT = int(os.getenv("STATS_TOP_DEFAULT_LIMIT", "10"))
+TOP_MAX_LIMIT = int(os.getenv("STATS_TOP_MAX_LIMIT", "100"))
+TOP_WINDOW_RETENTION_DAYS = int(os.getenv("STATS_TOP_WINDOW_RETENTION_DAYS", "8"))
@@ -1,51 +1,72 @@
 from clickhouse_driver import Client
 from typing import List, Dict
 from datetime import datetime
+import hashlib
+
+from config import TOP_DEFAULT_LIMIT, TOP_MAX_LIMIT
+
+TOP_METRICS = {
+    "post_viewed": "view",
+    "post_liked": "like",
+    "post_commented": "comment"
+}
+# a window of N hours covers the current, partial hour bucket plus the N full buckets before it,
+# so "hour" spans 60-120 minutes and "day" 24-25 hours; "" and "all" read all-time totals
+TOP_WINDOWS = {
+    "": None,
+    "all": None,
+    "hour": 1,
+    "day": 24,
+    "week": 24 * 7
+}
 
 
 class StatsDB:
-    def __init__(self, host: str = "stats-service-db", database: str = "default"):
-        self.client = Client(user='user', password='password', host=host, database=database)
-        self._init_tables()
-
-    def _init_tables(self):
-        self.client.execute("""
-        CREATE TABLE IF NOT EXISTS post_events (
-            event_time DateTime,
-            post_id UInt64,
-            user_id UInt64,
-            event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3)
-        ) ENGINE = MergeTree()
-        ORDER BY (post_id, event_time)
-        """)
-
-    def insert_event(self, event_time: datetime, post_id: int, user_id: int, event_type: str):
+    def __init__(self, host: str = "stats-service-db", database: str = "default", client: Client = None):
+        self.client = client or Client(user='user', password='password', host=host, database=database)
+
+    def insert_event(self, event_time: datetime, post_id: int, user_id: int, event_type: str, event_id: str):
+        self.client.execute(
+            "INSERT INTO post_events (event_time, post_id, user_id, event_type, event_id) VALUES",
+            [(event_time, post_id, user_id, event_type, event_id)]
+        )
+
+    def insert_events(self, columns: List[list]):
+        event_ids = columns[4]
+        token = hashlib.sha1("\n".join(event_ids).encode()).hexdigest()
         self.client.execute(
-            "INSERT INTO post_events (event_time, post_id, user_id, event_type) VALUES",
-            [(event_time, post_id, user_id, event_type)]
+            "INSERT INTO post_events (event_time, post_id, user_id, event_type, event_id) VALUES",
+            columns,
+            columnar=True,
+            settings={"insert_deduplication_token": token, "deduplicate_blocks_in_dependent_materialized_views": 1}
         )
 
     def get_post_stats(self, post_id: int) -> Dict[str, int]:
         result = self.client.execute("""
             SELECT
-                sum(event_type = 'view') AS views,
-                sum(event_type = 'like') AS likes,
-                sum(event_type = 'comment') AS comments
-            FROM post_events
+                uniqExactMergeIf(events, event_type = 'view') AS views,
+                uniqExactMergeIf(events, event_type = 'like') AS likes,
+                uniqExactMergeIf(events, event_type = 'comment') AS comments
+            FROM post_daily_stats
             WHERE post_id = %(post_id)s
         """, {'post_id': post_id})
 
         views, likes, comments = result[0]
-        return {"views": views, "likes": likes, "comments": comments}
+        unique_viewers = self.client.execute("""
+            SELECT uniqCombined64Merge(viewers)
+            FROM post_daily_viewers
+            WHERE post_id = %(post_id)s
+        """, {'post_id': post_id})[0][0]
+        return {"views": views, "likes": likes, "comments": comments, "unique_viewers": unique_viewers}
 
     def get_post_dynamics(self, post_id: int) -> List[Dict]:
         result = self.client.execute("""
             SELECT
-                toDate(event_time) as ts,
-                sum(event_type = 'view') AS views,
-                sum(event_type = 'like') AS likes,
-                sum(event_type = 'comment') AS comments
-            FROM post_events
+                day AS ts,
+                uniqExactMergeIf(events, event_type = 'view') AS views,
+                uniqExactMergeIf(events, event_type = 'like') AS likes,
+                uniqExactMergeIf(events, event_type = 'comment') AS comments
+            FROM post_daily_stats
             WHERE post_id = %(post_id)s
             GROUP BY ts
             ORDER BY ts
@@ -57,14 +78,16 @@ class StatsDB:
         ]
 
     def get_post_timeline(self, post_id: int, metric: str) -> List[Dict]:
+        if metric == "viewer":
+            return self._get_post_viewers_timeline(post_id)
         if metric not in ["view", "like", "comment"]:
             raise ValueError("Invalid metric")
 
         result = self.client.execute(f"""
             SELECT
-                toDate(event_time) AS ts,
-                count() AS count
-            FROM post_events
+                day AS ts,
+                uniqExactMerge(events) AS count
+            FROM post_daily_stats
             WHERE post_id = %(post_id)s AND event_type = %(metric)s
             GROUP BY ts
             ORDER BY ts
@@ -72,48 +95,51 @@ class StatsDB:
 
         return [{"date": ts.isoformat(), "count": count} for ts, count in result]
 
-    def get_top_posts(self, metric: str, limit: int = 10) -> List[Dict]:
-        if metric not in ["post_viewed", "post_liked", "post_commented"]:
-            raise ValueError("Invalid metric")
-
-        metric_map = {
-            "post_viewed": "view",
-            "post_liked": "like",
-            "post_commented": "comment"
-        }
-
-        event = metric_map[metric]
-
+    def _get_post_viewers_timeline(self, post_id: int) -> List[Dict]:
         result = self.client.execute("""
-            SELECT post_id, count() as cnt
-            FROM post_events
-            WHERE event_type = %(event)s
-            GROUP BY post_id
-            ORDER BY cnt DESC
-            LIMIT %(limit)s
-        """, {'event': event, 'limit': limit})
+            SELECT
+                day AS ts,
+                uniqCombined64Merge(viewers) AS count
+            FROM post_daily_viewers
+            WHERE post_id = %(post_id)s
+            GROUP BY ts
+            ORDER BY ts
+        """, {'post_id': post_id})
 
-        return [{"post_id": pid, "count": cnt} for pid, cnt in result]
+        return [{"date": ts.isoformat(), "count": count} for ts, count in result]
 
-    def get_top_users(self, metric: str, limit: int = 10) -> List[Dict]:
-        if metric not in ["post_viewed", "post_liked", "post_commented"]:
+    def _get_top(self, entity: str, metric: str, limit: int, window: str) -> List[tuple]:
+        if metric not in TOP_METRICS:
             raise ValueError("Invalid metric")
-
-        metric_map = {
-            "post_viewed": "view",
-            "post_liked": "like",
-            "post_commented": "comment"
-        }
-
-        event = metric_map[metric]
-
-        result = self.client.execute("""
-            SELECT user_id, count() as cnt
-            FROM post_events
-            WHERE event_type = %(event)s
-            GROUP BY user_id
-            ORDER BY cnt DESC
+        if window not in TOP_WINDOWS:
+            raise ValueError("Invalid window")
+        if limit < 0 or limit > TOP_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {TOP_MAX_LIMIT}, or 0 for the default")
+
+        params = {'entity': entity, 'event': TOP_METRICS[metric], 'limit': limit or TOP_DEFAULT_LIMIT}
+        if TOP_WINDOWS[window] is None:
+            return self.client.execute("""
+                SELECT id, uniqExactMerge(events) AS cnt
+                FROM total_counts
+                WHERE entity = %(entity)s AND event_type = %(event)s
+                GROUP BY id
+                ORDER BY cnt DESC, id
+                LIMIT %(limit)s
+            """, params)
+
+        params['hours'] = TOP_WINDOWS[window]
+        return self.client.execute("""
+            SELECT id, uniqExactMerge(events) AS cnt
+            FROM hourly_counts
+            WHERE entity = %(entity)s AND event_type = %(event)s
+                AND hour >= toStartOfHour(now()) - INTERVAL %(hours)s HOUR
+            GROUP BY id
+            ORDER BY cnt DESC, id
             LIMIT %(limit)s
-        """, {'event': event, 'limit': limit})
+        """, params)
+
+    def get_top_posts(self, metric: str, limit: int = TOP_DEFAULT_LIMIT, window: str = "") -> List[Dict]:
+        return [{"post_id": pid, "count": cnt} for pid, cnt in self._get_top("post", metric, limit, window)]
 
-        return [{"user_id": uid, "count": cnt} for uid, cnt in result]
+    def get_top_users(self, metric: str, limit: int = TOP_DEFAULT_LIMIT, window: str = "") -> List[Dict]:
+        return [{"user_id": uid, "count": cnt} for uid, cnt in self._get_top("user", metric, limit, window)]
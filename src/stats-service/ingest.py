@@ -0,0 +1,42 @@
+import multiprocessing
+import signal
+import time
+
+import kafka_consumer
+from config import INGEST_WORKERS
+
+RESTART_DELAY = 5
+
+
+def start_worker(context, worker_id):
+    process = context.Process(target=kafka_consumer.consume, name=f"stats-ingest-{worker_id}")
+    process.start()
+    print(f"Started ingestion worker {worker_id} (pid {process.pid})", flush=True)
+    return process
+
+
+def run(workers=INGEST_WORKERS):
+    context = multiprocessing.get_context("spawn")
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+
+    processes = [start_worker(context, worker_id) for worker_id in range(workers)]
+    while not stopping:
+        time.sleep(1)
+        for worker_id, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                print(f"Ingestion worker {worker_id} exited with {process.exitcode}, restarting", flush=True)
+                time.sleep(RESTART_DELAY)
+                processes[worker_id] = start_worker(context, worker_id)
+
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+    print("Ingestion workers stopped", flush=True)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,13 +1,73 @@
 import time
 import json
-from confluent_kafka import Consumer, KafkaError
+import signal
+from confluent_kafka import Consumer, KafkaError, KafkaException
 from confluent_kafka.admin import AdminClient
 from database import StatsDB
-from datetime import datetime
+from config import KAFKA_BROKER, INGEST_BATCH_SIZE, INGEST_FLUSH_INTERVAL, INGEST_RETRY_INTERVAL
+from datetime import datetime, timedelta
+import events_pb2
 
-BOOTSTRAP_SERVERS = 'kafka:9092'
+BOOTSTRAP_SERVERS = KAFKA_BROKER
 TOPICS = ['post-events', 'post-interactions']
 
+EVENT_TYPES = {
+    'post_viewed': 'view',
+    'post_liked': 'like',
+    'post_commented': 'comment'
+}
+SCHEMA_VERSION_HEADER = 'schema-version'
+JSON_SCHEMA_VERSION = 1
+PROTOBUF_SCHEMA_VERSION = 2
+EPOCH = datetime(1970, 1, 1)
+
+def schema_version(headers):
+    for key, value in headers or ():
+        if key == SCHEMA_VERSION_HEADER:
+            return int(value)
+    return JSON_SCHEMA_VERSION
+
+def decode_protobuf(value):
+    event = events_pb2.Event.FromString(value)
+    event_type = event.WhichOneof("payload")
+    if event_type not in EVENT_TYPES:
+        return event_type, None
+    payload = getattr(event, event_type)
+    return event_type, {
+        "event_time": EPOCH + timedelta(milliseconds=payload.timestamp) if payload.timestamp else datetime.now(),
+        "post_id": payload.post_id,
+        "user_id": payload.user_id,
+        "event_id": payload.event_id
+    }
+
+def decode_json(value):
+    data = json.loads(value.decode('utf-8'))
+    event_type = data.get("event_type")
+    if event_type not in EVENT_TYPES:
+        return event_type, None
+    ts_str = data.get("timestamp")
+    return event_type, {
+        "event_time": datetime.fromisoformat(ts_str) if ts_str else datetime.now(),
+        "post_id": int(data["post_id"]),
+        "user_id": int(data["user_id"]),
+        "event_id": data.get("event_id", "")
+    }
+
+def decode_event(value, headers):
+    version = schema_version(headers)
+    if version == PROTOBUF_SCHEMA_VERSION:
+        return decode_protobuf(value)
+    if version == JSON_SCHEMA_VERSION:
+        return decode_json(value)
+    raise ValueError(f"Unknown event schema version: {version}")
+
+def event_id(event_type, event, msg):
+    if event["event_id"]:
+        return event["event_id"]
+    if event_type == "post_liked":
+        return f"post_liked:{event['post_id']}:{event['user_id']}"
+    return f"{msg.topic()}:{msg.partition()}:{msg.offset()}"
+
 def wait_for_topics(bootstrap_servers, topics):
     admin = AdminClient({'bootstrap.servers': bootstrap_servers})
     start = time.time()
@@ -21,54 +81,161 @@ def wait_for_topics(bootstrap_servers, topics):
         print(f"Waiting for topics to be created: {missing}", flush=True)
         time.sleep(3)
 
-def consume(mock_db=None, mock_consumer=None):
-    if not wait_for_topics(BOOTSTRAP_SERVERS, TOPICS):
-        print("Topics not available, exiting", flush=True)
-        return
-    db = mock_db or StatsDB()
-    consumer = mock_consumer or Consumer({
-        'bootstrap.servers': BOOTSTRAP_SERVERS,
-        'group.id': 'stats-consumer',
-        'auto.offset.reset': 'earliest'
-    })
+class EventBatch:
+    def __init__(self):
+        self.clear()
 
-    consumer.subscribe(TOPICS)
-    print("Subscribed to topics, starting consumption", flush=True)
+    def append(self, event_time, post_id, user_id, event_type, event_id):
+        self.event_times.append(event_time)
+        self.post_ids.append(post_id)
+        self.user_ids.append(user_id)
+        self.event_types.append(event_type)
+        self.event_ids.append(event_id)
 
-    while True:
-        msg = consumer.poll(1.0)
-        if msg is None:
-            continue
+    def columns(self):
+        return [self.event_times, self.post_ids, self.user_ids, self.event_types, self.event_ids]
+
+    def clear(self):
+        self.event_times = []
+        self.post_ids = []
+        self.user_ids = []
+        self.event_types = []
+        self.event_ids = []
+
+    def __len__(self):
+        return len(self.post_ids)
+
+class EventIngestor:
+    def __init__(self, db, consumer, batch_size=INGEST_BATCH_SIZE, flush_interval=INGEST_FLUSH_INTERVAL,
+                 retry_interval=INGEST_RETRY_INTERVAL):
+        self.db = db
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.batch = EventBatch()
+        self.uncommitted = 0
+        self.last_flush = time.monotonic()
+        self.running = True
+        self.retrying = False
+
+    def handle(self, msg):
         if msg.error():
             if msg.error().code() == KafkaError.UNKNOWN_TOPIC_OR_PART:
                 print("Topic not yet available, waiting...", flush=True)
                 time.sleep(5)
-                continue
+                return
             print(f"Consumer error: {msg.error()}", flush=True)
-            continue
+            return
 
+        self.uncommitted += 1
         try:
-            data = json.loads(msg.value().decode('utf-8'))
-            event_type_map = {
-                'post_viewed': 'view',
-                'post_liked': 'like',
-                'post_commented': 'comment'
-            }
-            event_type_raw = data.get("event_type")
-            event_type = event_type_map.get(event_type_raw)
-
-            if event_type is None:
+            event_type_raw, event = decode_event(msg.value(), msg.headers())
+            if event is None:
                 print(f"Unknown event_type: {event_type_raw}, skipping", flush=True)
-                continue
+                return
 
-            ts_str = data.get("timestamp")
-            event_time = datetime.fromisoformat(ts_str) if ts_str else datetime.now()
-
-            db.insert_event(
-                event_time=event_time,
-                post_id=int(data["post_id"]),
-                user_id=int(data["user_id"]),
-                event_type=event_type
+            self.batch.append(
+                event["event_time"],
+                event["post_id"],
+                event["user_id"],
+                EVENT_TYPES[event_type_raw],
+                event_id(event_type_raw, event, msg)
             )
         except Exception as e:
             print(f"Failed to process message: {e}", flush=True)
+
+    def insert_batch(self):
+        paused = []
+        self.retrying = True
+        try:
+            while len(self.batch):
+                try:
+                    self.db.insert_events(self.batch.columns())
+                    return True
+                except Exception as e:
+                    if not self.running:
+                        print(f"Failed to insert {len(self.batch)} events while stopping: {e}", flush=True)
+                        return False
+                    print(f"Failed to insert {len(self.batch)} events, retrying: {e}", flush=True)
+                # keep polling while paused so the consumer stays in the group during an outage
+                if not paused:
+                    paused = self.consumer.assignment()
+                    self.consumer.pause(paused)
+                msg = self.consumer.poll(self.retry_interval)
+                if msg is not None:
+                    self.handle(msg)
+            return True
+        finally:
+            self.retrying = False
+            if paused:
+                self.consumer.resume(paused)
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.uncommitted:
+            return
+        if not self.insert_batch():
+            print("Offsets left uncommitted, the batch will be redelivered", flush=True)
+            self.batch.clear()
+            self.uncommitted = 0
+            return
+        self.batch.clear()
+        try:
+            self.consumer.commit(asynchronous=False)
+        except KafkaException as e:
+            print(f"Failed to commit offsets: {e}", flush=True)
+        self.uncommitted = 0
+
+    def due(self):
+        return len(self.batch) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval
+
+    def poll(self):
+        msg = self.consumer.poll(min(self.flush_interval, 1.0))
+        if msg is not None:
+            self.handle(msg)
+        if self.due():
+            self.flush()
+
+    def on_assign(self, consumer, partitions):
+        print(f"Assigned partitions: {[(p.topic, p.partition) for p in partitions]}", flush=True)
+
+    def on_revoke(self, consumer, partitions):
+        print(f"Revoking partitions: {[(p.topic, p.partition) for p in partitions]}", flush=True)
+        if not self.retrying:
+            self.flush()
+
+    def on_lost(self, consumer, partitions):
+        print(f"Lost partitions: {[(p.topic, p.partition) for p in partitions]}, dropping batch", flush=True)
+        self.batch.clear()
+        self.uncommitted = 0
+
+    def stop(self, *args):
+        self.running = False
+
+    def run(self):
+        while self.running:
+            self.poll()
+        self.flush()
+        self.consumer.close()
+
+def consume(mock_db=None, mock_consumer=None):
+    if not wait_for_topics(BOOTSTRAP_SERVERS, TOPICS):
+        print("Topics not available, exiting", flush=True)
+        return
+    db = mock_db or StatsDB()
+    consumer = mock_consumer or Consumer({
+        'bootstrap.servers': BOOTSTRAP_SERVERS,
+        'group.id': 'stats-consumer',
+        'auto.offset.reset': 'earliest',
+        'enable.auto.commit': False,
+        'partition.assignment.strategy': 'cooperative-sticky'
+    })
+
+    ingestor = EventIngestor(db, consumer)
+    signal.signal(signal.SIGTERM, ingestor.stop)
+    signal.signal(signal.SIGINT, ingestor.stop)
+    consumer.subscribe(TOPICS, on_assign=ingestor.on_assign, on_revoke=ingestor.on_revoke, on_lost=ingestor.on_lost)
+    print("Subscribed to topics, starting consumption", flush=True)
+
+    ingestor.run()
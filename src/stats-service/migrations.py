@@ -0,0 +1,204 @@
+import datetime
+
+from clickhouse_driver import Client
+
+from config import TOP_WINDOW_RETENTION_DAYS
+
+MIGRATIONS_TABLE = "stats_schema_migrations"
+# rollups count distinct keys, so a redelivered or replayed event is never counted twice:
+# a like counts once per user, other events once per event id
+EVENT_KEY = "if(event_type = 'like', user_id, sipHash64(event_id))"
+
+
+def table_engine(client, name):
+    result = client.execute("""
+        SELECT engine FROM system.tables
+        WHERE database = currentDatabase() AND name = %(name)s
+    """, {'name': name})
+    return result[0][0] if result else None
+
+
+def deduplicate_events(client):
+    # copy into a new table and swap it in; rerunning restarts an interrupted copy
+    if table_engine(client, "post_events") == "MergeTree":
+        client.execute("DROP TABLE IF EXISTS post_events_dedup")
+        client.execute("""
+        CREATE TABLE post_events_dedup (
+            event_time DateTime,
+            post_id UInt64,
+            user_id UInt64,
+            event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3),
+            event_id String
+        ) ENGINE = ReplacingMergeTree()
+        ORDER BY (post_id, event_type, event_id)
+        SETTINGS non_replicated_deduplication_window = 1000
+        """)
+        client.execute("""
+            INSERT INTO post_events_dedup (event_time, post_id, user_id, event_type, event_id)
+            SELECT event_time, post_id, user_id, event_type,
+                if(event_type = 'like', concat('post_liked:', toString(post_id), ':', toString(user_id)),
+                   toString(generateUUIDv4()))
+            FROM post_events
+        """)
+        client.execute("EXCHANGE TABLES post_events AND post_events_dedup")
+    client.execute("DROP TABLE IF EXISTS post_events_dedup")
+
+
+def rebuild_rollup(table, create, backfill, view):
+    # the view is attached only after the backfill, and a rerun starts from an empty table
+    def step(client):
+        client.execute(f"DROP VIEW IF EXISTS {table}_mv")
+        client.execute(f"DROP TABLE IF EXISTS {table}")
+        client.execute(create)
+        client.execute(f"INSERT INTO {table} {backfill}")
+        client.execute(f"CREATE MATERIALIZED VIEW {table}_mv TO {table} AS {view}")
+    return step
+
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS post_events (
+            event_time DateTime,
+            post_id UInt64,
+            user_id UInt64,
+            event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3)
+        ) ENGINE = MergeTree()
+        ORDER BY (post_id, event_time)
+        """
+    ]),
+    (2, "deduplicated events", [deduplicate_events]),
+    (3, "daily stats rollup", [rebuild_rollup(
+        "post_daily_stats",
+        """
+        CREATE TABLE post_daily_stats (
+            post_id UInt64,
+            day Date,
+            event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3),
+            events AggregateFunction(uniqExact, UInt64)
+        ) ENGINE = AggregatingMergeTree()
+        ORDER BY (post_id, day, event_type)
+        """,
+        f"""
+        SELECT post_id, toDate(event_time) AS day, event_type, uniqExactState({EVENT_KEY}) AS events
+        FROM post_events
+        GROUP BY post_id, day, event_type
+        """,
+        f"""
+        SELECT post_id, toDate(event_time) AS day, event_type, uniqExactState({EVENT_KEY}) AS events
+        FROM post_events
+        GROUP BY post_id, day, event_type
+        """
+    )]),
+    (4, "top counts rollups", [
+        rebuild_rollup(
+            "hourly_counts",
+            f"""
+            CREATE TABLE hourly_counts (
+                entity Enum8('post' = 1, 'user' = 2),
+                event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3),
+                hour DateTime,
+                id UInt64,
+                events AggregateFunction(uniqExact, UInt64)
+            ) ENGINE = AggregatingMergeTree()
+            ORDER BY (entity, event_type, hour, id)
+            TTL hour + INTERVAL {TOP_WINDOW_RETENTION_DAYS} DAY
+            """,
+            f"""
+            SELECT entity, event_type, toStartOfHour(event_time) AS hour,
+                if(entity = 'post', post_id, user_id) AS id, uniqExactState(sipHash64(event_id)) AS events
+            FROM post_events
+            ARRAY JOIN ['post', 'user'] AS entity
+            WHERE event_time > now() - INTERVAL {TOP_WINDOW_RETENTION_DAYS} DAY
+            GROUP BY entity, event_type, hour, id
+            """,
+            """
+            SELECT entity, event_type, toStartOfHour(event_time) AS hour,
+                if(entity = 'post', post_id, user_id) AS id, uniqExactState(sipHash64(event_id)) AS events
+            FROM post_events
+            ARRAY JOIN ['post', 'user'] AS entity
+            GROUP BY entity, event_type, hour, id
+            """
+        ),
+        rebuild_rollup(
+            "total_counts",
+            """
+            CREATE TABLE total_counts (
+                entity Enum8('post' = 1, 'user' = 2),
+                event_type Enum8('view' = 1, 'like' = 2, 'comment' = 3),
+                id UInt64,
+                events AggregateFunction(uniqExact, UInt64)
+            ) ENGINE = AggregatingMergeTree()
+            ORDER BY (entity, event_type, id)
+            """,
+            """
+            SELECT entity, event_type, if(entity = 'post', post_id, user_id) AS id,
+                uniqExactState(sipHash64(event_id)) AS events
+            FROM post_events
+            ARRAY JOIN ['post', 'user'] AS entity
+            GROUP BY entity, event_type, id
+            """,
+            """
+            SELECT entity, event_type, if(entity = 'post', post_id, user_id) AS id,
+                uniqExactState(sipHash64(event_id)) AS events
+            FROM post_events
+            ARRAY JOIN ['post', 'user'] AS entity
+            GROUP BY entity, event_type, id
+            """
+        )
+    ]),
+    (5, "daily unique viewers rollup", [rebuild_rollup(
+        "post_daily_viewers",
+        """
+        CREATE TABLE post_daily_viewers (
+            post_id UInt64,
+            day Date,
+            viewers AggregateFunction(uniqCombined64, UInt64)
+        ) ENGINE = AggregatingMergeTree()
+        ORDER BY (post_id, day)
+        """,
+        """
+        SELECT post_id, toDate(event_time) AS day, uniqCombined64State(user_id) AS viewers
+        FROM post_events
+        WHERE event_type = 'view'
+        GROUP BY post_id, day
+        """,
+        """
+        SELECT post_id, toDate(event_time) AS day, uniqCombined64State(user_id) AS viewers
+        FROM post_events
+        WHERE event_type = 'view'
+        GROUP BY post_id, day
+        """
+    )])
+]
+
+
+def applied_versions(client):
+    return {row[0] for row in client.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")}
+
+
+def migrate(client, migrations=MIGRATIONS):
+    # not safe to run concurrently: deployments run it once, before the server and ingest workers start
+    client.execute(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (version UInt32, name String, applied_at DateTime) "
+        "ENGINE = MergeTree() ORDER BY version"
+    )
+    applied = applied_versions(client)
+    for version, name, steps in migrations:
+        if version in applied:
+            continue
+        for step in steps:
+            if callable(step):
+                step(client)
+            else:
+                client.execute(step)
+        client.execute(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES",
+            [(version, name, datetime.datetime.now())]
+        )
+    return max(applied_versions(client), default=0)
+
+
+if __name__ == "__main__":
+    version = migrate(Client(user='user', password='password', host="stats-service-db"))
+    print(f"Stats schema at version {version}", flush=True)
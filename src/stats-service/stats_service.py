@@ -4,9 +4,6 @@ from concurrent import futures
 import stats_service_pb2 as pb2
 import stats_service_pb2_grpc as pb2_grpc
 
-import kafka_consumer
-import threading
-
 from database import StatsDB
 
 
@@ -21,6 +18,7 @@ class StatsService(pb2_grpc.StatsServiceServicer):
             views=stats["views"],
             likes=stats["likes"],
             comments=stats["comments"],
+            unique_viewers=stats["unique_viewers"],
         )
 
     def GetPostViewsTimeline(self, request, context):
@@ -44,9 +42,16 @@ class StatsService(pb2_grpc.StatsServiceServicer):
             timeline=[pb2.DayStat(date=entry["date"], count=entry["count"]) for entry in timeline]
         )
 
+    def GetPostUniqueViewersTimeline(self, request, context):
+        timeline = self.db.get_post_timeline(request.post_id, "viewer")
+        return pb2.PostTimelineResponse(
+            post_id=request.post_id,
+            timeline=[pb2.DayStat(date=entry["date"], count=entry["count"]) for entry in timeline]
+        )
+
     def GetTopPosts(self, request, context):
         try:
-            posts = self.db.get_top_posts(request.metric)
+            posts = self.db.get_top_posts(request.metric, request.limit, request.window)
         except ValueError as e:
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
 
@@ -56,7 +61,7 @@ class StatsService(pb2_grpc.StatsServiceServicer):
 
     def GetTopUsers(self, request, context):
         try:
-            users = self.db.get_top_users(request.metric)
+            users = self.db.get_top_users(request.metric, request.limit, request.window)
         except ValueError as e:
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
 
@@ -71,9 +76,6 @@ def serve():
     server.add_insecure_port('[::]:5000')
     server.start()
     print("Server started on port 5000", flush=True)
-
-    consumer_thread = threading.Thread(target=kafka_consumer.consume(), daemon=True)
-    consumer_thread.start()
     server.wait_for_termination()
 
 
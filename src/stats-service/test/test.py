@@ -1,9 +1,15 @@
 import pytest
 from unittest.mock import MagicMock
 import grpc
+import json
+from datetime import datetime
 
 import stats_service_pb2 as pb2
+import events_pb2
 from stats_service import StatsService
+from database import StatsDB
+from kafka_consumer import decode_event, EventIngestor
+from migrations import migrate, deduplicate_events, rebuild_rollup
 
 
 @pytest.fixture
@@ -23,7 +29,7 @@ def stats_service(mock_db):
 
 def test_get_post_stats(stats_service):
     service, db = stats_service
-    db.get_post_stats.return_value = {"views": 100, "likes": 50, "comments": 20}
+    db.get_post_stats.return_value = {"views": 100, "likes": 50, "comments": 20, "unique_viewers": 40}
 
     request = pb2.PostRequest(post_id=1)
     response = service.GetPostStats(request, None)
@@ -32,11 +38,12 @@ def test_get_post_stats(stats_service):
     assert response.views == 100
     assert response.likes == 50
     assert response.comments == 20
+    assert response.unique_viewers == 40
 
 
 def test_get_post_stats_no_data(stats_service):
     service, db = stats_service
-    db.get_post_stats.return_value = {"views": 0, "likes": 0, "comments": 0}
+    db.get_post_stats.return_value = {"views": 0, "likes": 0, "comments": 0, "unique_viewers": 0}
 
     request = pb2.PostRequest(post_id=2)
     response = service.GetPostStats(request, None)
@@ -70,9 +77,10 @@ def test_get_top_posts(stats_service):
         {"post_id": 2, "count": 20}
     ]
 
-    request = pb2.TopRequest(metric="post_viewed")
+    request = pb2.TopRequest(metric="post_viewed", limit=2, window="day")
     response = service.GetTopPosts(request, None)
 
+    db.get_top_posts.assert_called_once_with("post_viewed", 2, "day")
     assert len(response.posts) == 2
     assert response.posts[0].post_id == 1
     assert response.posts[0].count == 30
@@ -146,6 +154,20 @@ def test_get_post_comments_timeline(stats_service):
     assert response.timeline[0].count == 1
 
 
+def test_get_post_unique_viewers_timeline(stats_service):
+    service, db = stats_service
+    db.get_post_timeline.return_value = [
+        {"date": "2024-03-01", "count": 12},
+        {"date": "2024-03-02", "count": 4}
+    ]
+
+    request = pb2.PostRequest(post_id=77)
+    response = service.GetPostUniqueViewersTimeline(request, None)
+
+    db.get_post_timeline.assert_called_once_with(77, "viewer")
+    assert [(d.date, d.count) for d in response.timeline] == [("2024-03-01", 12), ("2024-03-02", 4)]
+
+
 def test_get_post_views_timeline_empty(stats_service):
     service, db = stats_service
     db.get_post_timeline.return_value = []
@@ -181,7 +203,7 @@ def test_get_post_comments_timeline_empty(stats_service):
 
 def test_get_post_stats_extreme_values(stats_service):
     service, db = stats_service
-    db.get_post_stats.return_value = {"views": 2**60, "likes": 2**55, "comments": 2**50}
+    db.get_post_stats.return_value = {"views": 2**60, "likes": 2**55, "comments": 2**50, "unique_viewers": 2**40}
 
     request = pb2.PostRequest(post_id=999)
     response = service.GetPostStats(request, None)
@@ -189,3 +211,217 @@ def test_get_post_stats_extreme_values(stats_service):
     assert response.views == 2**60
     assert response.likes == 2**55
     assert response.comments == 2**50
+    assert response.unique_viewers == 2**40
+
+
+def test_decode_event_supports_json_and_protobuf():
+    json_value = json.dumps({
+        "event_type": "post_liked", "user_id": 3, "post_id": 7, "timestamp": "2024-01-02T03:04:05.006000"
+    }).encode()
+    protobuf_value = events_pb2.Event(post_liked=events_pb2.PostLiked(
+        user_id=3, post_id=7, timestamp=1704164645006
+    )).SerializeToString()
+    expected = {"event_time": datetime(2024, 1, 2, 3, 4, 5, 6000), "post_id": 7, "user_id": 3, "event_id": ""}
+
+    assert decode_event(json_value, None) == ("post_liked", expected)
+    assert decode_event(json_value, [("schema-version", b"1")]) == ("post_liked", expected)
+    assert decode_event(protobuf_value, [("schema-version", b"2")]) == ("post_liked", expected)
+    assert len(protobuf_value) < len(json_value) / 3
+
+    created = events_pb2.Event(post_created=events_pb2.PostCreated(post_id=7)).SerializeToString()
+    assert decode_event(created, [("schema-version", b"2")]) == ("post_created", None)
+    with pytest.raises(ValueError):
+        decode_event(protobuf_value, [("schema-version", b"3")])
+
+
+class FakeMessage:
+    def __init__(self, value, headers=None, offset=0):
+        self._value = value
+        self._headers = headers
+        self._offset = offset
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+    def topic(self):
+        return "post-interactions"
+
+    def partition(self):
+        return 0
+
+    def offset(self):
+        return self._offset
+
+
+def liked_message(user_id, post_id, event_id=""):
+    return FakeMessage(events_pb2.Event(post_liked=events_pb2.PostLiked(
+        user_id=user_id, post_id=post_id, timestamp=1704164645000, event_id=event_id
+    )).SerializeToString(), [("schema-version", b"2")])
+
+
+def test_ingestor_flushes_columnar_batches_before_committing(mock_db):
+    consumer = MagicMock()
+    consumer.poll.return_value = None
+    consumer.assignment.return_value = ["post-interactions:0"]
+    ingestor = EventIngestor(mock_db, consumer, batch_size=3, flush_interval=60, retry_interval=0)
+    mock_db.insert_events.side_effect = [RuntimeError("too many parts"), None, None]
+
+    for i in range(3):
+        ingestor.handle(liked_message(user_id=i, post_id=7))
+        assert ingestor.due() == (i == 2)
+    consumer.commit.assert_not_called()
+    ingestor.flush()
+
+    event_time = datetime(2024, 1, 2, 3, 4, 5)
+    mock_db.insert_events.assert_called_with([
+        [event_time] * 3, [7, 7, 7], [0, 1, 2], ["like"] * 3, [f"post_liked:7:{i}" for i in range(3)]
+    ])
+    assert mock_db.insert_events.call_count == 2
+    consumer.pause.assert_called_once_with(["post-interactions:0"])
+    consumer.poll.assert_called_once_with(0)
+    consumer.resume.assert_called_once_with(["post-interactions:0"])
+    consumer.commit.assert_called_once_with(asynchronous=False)
+    assert len(ingestor.batch) == 0
+
+    ingestor.handle(FakeMessage(events_pb2.Event(
+        post_created=events_pb2.PostCreated(post_id=8)
+    ).SerializeToString(), [("schema-version", b"2")]))
+    ingestor.flush()
+    assert mock_db.insert_events.call_count == 2
+    assert consumer.commit.call_count == 2
+
+
+def test_ingestor_stops_retrying_when_shutting_down(mock_db):
+    consumer = MagicMock()
+    consumer.poll.side_effect = lambda timeout: ingestor.stop()
+    ingestor = EventIngestor(mock_db, consumer, batch_size=100, flush_interval=60, retry_interval=0)
+    mock_db.insert_events.side_effect = RuntimeError("connection refused")
+
+    ingestor.handle(liked_message(user_id=1, post_id=7))
+    ingestor.flush()
+
+    assert mock_db.insert_events.call_count == 2
+    consumer.commit.assert_not_called()
+    consumer.resume.assert_called_once()
+    assert len(ingestor.batch) == 0
+
+
+def test_ingestor_handles_rebalance_and_shutdown(mock_db):
+    consumer = MagicMock()
+    consumer.poll.return_value = None
+    ingestor = EventIngestor(mock_db, consumer, batch_size=100, flush_interval=60)
+
+    ingestor.handle(liked_message(user_id=1, post_id=7))
+    ingestor.on_revoke(consumer, [])
+    assert mock_db.insert_events.call_count == 1
+    consumer.commit.assert_called_once_with(asynchronous=False)
+
+    ingestor.handle(liked_message(user_id=2, post_id=7))
+    ingestor.on_lost(consumer, [])
+    assert len(ingestor.batch) == 0
+
+    ingestor.handle(liked_message(user_id=3, post_id=7))
+    consumer.poll.side_effect = lambda timeout: ingestor.stop()
+    ingestor.run()
+    assert mock_db.insert_events.call_count == 2
+    assert mock_db.insert_events.call_args.args[0][2] == [3]
+    assert consumer.commit.call_count == 2
+    consumer.close.assert_called_once()
+
+
+def test_events_are_deduplicated_by_event_id():
+    consumer = MagicMock()
+    client = MagicMock()
+    client.execute.return_value = [(0,)]
+    ingestor = EventIngestor(StatsDB(client=client), consumer, batch_size=100, flush_interval=60)
+
+    viewed = lambda offset, event_id="": FakeMessage(events_pb2.Event(post_viewed=events_pb2.PostViewed(
+        user_id=1, post_id=7, timestamp=1704164645000, event_id=event_id
+    )).SerializeToString(), [("schema-version", b"2")], offset=offset)
+    for msg in (viewed(10, "abc"), viewed(11), viewed(11), liked_message(1, 7, "post_liked:7:1"), liked_message(1, 7)):
+        ingestor.handle(msg)
+    assert ingestor.batch.event_ids == [
+        "abc", "post-interactions:0:11", "post-interactions:0:11", "post_liked:7:1", "post_liked:7:1"
+    ]
+
+    ingestor.flush()
+    query, columns = client.execute.call_args.args
+    first_token = client.execute.call_args.kwargs["settings"]["insert_deduplication_token"]
+    assert query.startswith("INSERT INTO post_events")
+    assert client.execute.call_args.kwargs["columnar"] is True
+
+    StatsDB(client=client).insert_events(columns)
+    assert client.execute.call_args.kwargs["settings"]["insert_deduplication_token"] == first_token
+
+
+def test_top_queries_use_windowed_rollups():
+    client = MagicMock()
+    client.execute.return_value = [(5, 42), (3, 17)]
+    db = StatsDB(client=client)
+
+    assert db.get_top_users("post_liked", 2, "week") == [{"user_id": 5, "count": 42}, {"user_id": 3, "count": 17}]
+    query, params = client.execute.call_args.args
+    assert "FROM hourly_counts" in query
+    assert "hour >= toStartOfHour(now()) - INTERVAL %(hours)s HOUR" in query
+    assert params == {"entity": "user", "event": "like", "limit": 2, "hours": 168}
+
+    db.get_top_posts("post_viewed", 0)
+    query, params = client.execute.call_args.args
+    assert "FROM total_counts" in query
+    assert params["limit"] == 10
+
+    for metric, limit, window in (("post_shared", 10, ""), ("post_viewed", 10, "year"), ("post_viewed", 1000, "")):
+        with pytest.raises(ValueError):
+            db.get_top_posts(metric, limit, window)
+    with pytest.raises(ValueError, match="or 0 for the default"):
+        db.get_top_posts("post_viewed", -1)
+
+
+def test_events_migration_resumes_interrupted_copy():
+    client = MagicMock()
+    client.execute.return_value = [("MergeTree",)]
+    deduplicate_events(client)
+    statements = [call.args[0].strip() for call in client.execute.call_args_list]
+    assert statements[1] == "DROP TABLE IF EXISTS post_events_dedup"
+    assert statements[-2:] == ["EXCHANGE TABLES post_events AND post_events_dedup", "DROP TABLE IF EXISTS post_events_dedup"]
+
+    client.reset_mock()
+    client.execute.return_value = [("ReplacingMergeTree",)]
+    deduplicate_events(client)
+    assert client.execute.call_args.args[0] == "DROP TABLE IF EXISTS post_events_dedup"
+
+
+def test_migrate_skips_applied_versions():
+    client = MagicMock()
+    client.execute.side_effect = lambda query, *args, **kwargs: [(1,)] if query.startswith("SELECT version") else []
+    step = MagicMock()
+    assert migrate(client, [(1, "applied", [step]), (2, "pending", [step, "CREATE TABLE t (x UInt8) ENGINE = Log"])]) == 1
+    step.assert_called_once_with(client)
+    assert any(call.args[0].startswith("CREATE TABLE t") for call in client.execute.call_args_list)
+
+
+def test_rollup_is_backfilled_before_view_is_attached():
+    client = MagicMock()
+    rebuild_rollup("daily", "CREATE TABLE daily (x UInt64) ENGINE = SummingMergeTree() ORDER BY x",
+                   "SELECT count() FROM post_events FINAL", "SELECT uniqExact(event_id) FROM post_events")(client)
+    statements = [call.args[0] for call in client.execute.call_args_list]
+    assert statements[:2] == ["DROP VIEW IF EXISTS daily_mv", "DROP TABLE IF EXISTS daily"]
+    assert statements[3] == "INSERT INTO daily SELECT count() FROM post_events FINAL"
+    assert statements[4].startswith("CREATE MATERIALIZED VIEW daily_mv TO daily")
+
+
+def test_post_stats_merge_exact_daily_states():
+    client = MagicMock()
+    client.execute.side_effect = [[(120001, 350, 7)], [(9000,)]]
+    db = StatsDB(client=client)
+
+    assert db.get_post_stats(1) == {"views": 120001, "likes": 350, "comments": 7, "unique_viewers": 9000}
+    query = client.execute.call_args_list[0].args[0]
+    assert "uniqExactMergeIf(events, event_type = 'view')" in query
+    assert "FROM post_daily_stats" in query
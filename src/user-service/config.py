@@ -0,0 +1,17 @@
+import os
+
+DB_POOL_SIZE = int(os.getenv("USERS_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("USERS_DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("USERS_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("USERS_DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("USERS_DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+KAFKA_BROKER = os.getenv("KAFKA_BROKER", "kafka:9092")
+KAFKA_PRODUCER_MODE = os.getenv("USERS_KAFKA_PRODUCER_MODE", "async")
+KAFKA_EVENT_FORMAT = os.getenv("USERS_KAFKA_EVENT_FORMAT", "protobuf")
+KAFKA_LINGER_MS = int(os.getenv("USERS_KAFKA_LINGER_MS", "20"))
+KAFKA_BATCH_SIZE = int(os.getenv("USERS_KAFKA_BATCH_SIZE", "262144"))
+KAFKA_COMPRESSION = os.getenv("USERS_KAFKA_COMPRESSION", "lz4")
+KAFKA_QUEUE_MAX_MESSAGES = int(os.getenv("USERS_KAFKA_QUEUE_MAX_MESSAGES", "100000"))
+KAFKA_QUEUE_TIMEOUT = float(os.getenv("USERS_KAFKA_QUEUE_TIMEOUT", "5"))
+KAFKA_FLUSH_TIMEOUT = float(os.getenv("USERS_KAFKA_FLUSH_TIMEOUT", "30"))
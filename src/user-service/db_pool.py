@@ -0,0 +1,85 @@
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+import threading
+import time
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    def __init__(self, buckets=WAIT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def observe_wait(self, wait_ms):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if wait_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool):
+        with self._lock:
+            stats = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin(),
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_sum_ms": self.wait_sum_ms,
+                "wait_max_ms": self.wait_max_ms
+            }
+            cumulative = 0
+            for bound, count in zip(self.buckets, self.bucket_counts):
+                cumulative += count
+                stats[f"wait_ms_bucket.le_{bound}"] = cumulative
+            stats["wait_ms_bucket.le_inf"] = cumulative + self.bucket_counts[-1]
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def create_instrumented_engine(url, **options):
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, **options)
+    engine.pool.metrics = PoolMetrics()
+    return engine
+
+
+def pool_stats(engine):
+    return engine.pool.metrics.stats(engine.pool)
@@ -0,0 +1 @@
+python -m grpc_tools.protoc -I./proto --python_out=. ./proto/events.proto
\ No newline at end of file
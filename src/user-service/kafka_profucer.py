@@ -1,22 +1,94 @@
-from confluent_kafka import Producer
-import json
-import os
+from confluent_kafka import Producer, KafkaException
+from config import KAFKA_BROKER, KAFKA_PRODUCER_MODE, KAFKA_EVENT_FORMAT, KAFKA_LINGER_MS, KAFKA_BATCH_SIZE, \
+    KAFKA_COMPRESSION, KAFKA_QUEUE_MAX_MESSAGES, KAFKA_QUEUE_TIMEOUT, KAFKA_FLUSH_TIMEOUT
+from event_codec import EVENT_FORMATS, encode_event
+import threading
+import time
 
-KAFKA_BROKER = 'kafka:9092'
+PRODUCER_MODES = ("sync", "async")
+POLL_INTERVAL = 0.1
 
-class KafkaProducer:
-    def __init__(self):
-        self.producer = Producer({
-            'bootstrap.servers': KAFKA_BROKER,
-            'message.max.bytes': 10000000
+def producer_config(mode):
+    config = {
+        'bootstrap.servers': KAFKA_BROKER,
+        'message.max.bytes': 10000000
+    }
+    if mode == "async":
+        config.update({
+            'linger.ms': KAFKA_LINGER_MS,
+            'batch.size': KAFKA_BATCH_SIZE,
+            'compression.type': KAFKA_COMPRESSION,
+            'queue.buffering.max.messages': KAFKA_QUEUE_MAX_MESSAGES
         })
+    return config
+
+class KafkaProducer:
+    def __init__(self, producer=None, mode=KAFKA_PRODUCER_MODE, event_format=KAFKA_EVENT_FORMAT,
+                 queue_timeout=KAFKA_QUEUE_TIMEOUT, flush_timeout=KAFKA_FLUSH_TIMEOUT):
+        if mode not in PRODUCER_MODES:
+            raise ValueError(f"Unknown producer mode: {mode}")
+        if event_format not in EVENT_FORMATS:
+            raise ValueError(f"Unknown event format: {event_format}")
+        self.mode = mode
+        self.event_format = event_format
+        self.queue_timeout = queue_timeout
+        self.flush_timeout = flush_timeout
+        self.producer = producer if producer is not None else Producer(producer_config(mode))
+        self.produced = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._poller = None
+        if mode == "async":
+            self._poller = threading.Thread(target=self._poll, name="kafka-poll", daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        while not self._stopped.is_set():
+            self.producer.poll(POLL_INTERVAL)
+
+    def _on_delivery(self, err, msg):
+        with self._lock:
+            if err is None:
+                self.produced += 1
+            else:
+                self.failed += 1
+
+    def _enqueue(self, topic, key, value, on_delivery):
+        deadline = time.monotonic() + self.queue_timeout
+        payload, headers = encode_event(value, self.event_format)
+        while True:
+            try:
+                self.producer.produce(topic=topic, key=key, value=payload, headers=headers, on_delivery=on_delivery)
+                return
+            except BufferError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self.failed += 1
+                    raise
+                self.producer.poll(min(remaining, POLL_INTERVAL))
+
+    def _flush(self):
+        remaining = self.producer.flush(self.flush_timeout)
+        if remaining:
+            raise KafkaException(f"{remaining} messages were not delivered in {self.flush_timeout}s")
 
     def produce(self, topic, key, value):
-        self.producer.produce(
-            topic=topic,
-            key=key,
-            value=json.dumps(value).encode('utf-8')
-        )
-        self.producer.flush()
-
-kafka_producer = KafkaProducer()
\ No newline at end of file
+        self._enqueue(topic, key, value, self._on_delivery)
+        if self.mode == "sync":
+            self._flush()
+
+    def close(self):
+        self._stopped.set()
+        if self._poller is not None:
+            self._poller.join()
+        return self.producer.flush(self.flush_timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "produced": self.produced,
+                "failed": self.failed,
+                "queued": len(self.producer)
+            }
@@ -0,0 +1,59 @@
+import datetime
+
+MIGRATIONS_TABLE = "users_schema_migrations"
+MIGRATIONS_LOCK_ID = 7202
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR NOT NULL,
+            password VARCHAR NOT NULL,
+            email VARCHAR NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+        """
+        CREATE TABLE IF NOT EXISTS profiles (
+            id SERIAL PRIMARY KEY,
+            first_name VARCHAR,
+            last_name VARCHAR,
+            bio VARCHAR,
+            birthday DATE,
+            phone_number VARCHAR,
+            second_email VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            user_id INTEGER NOT NULL UNIQUE REFERENCES users (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_profiles_id ON profiles (id)"
+    ])
+]
+
+
+def applied_versions(connection):
+    return {row[0] for row in connection.exec_driver_sql(f"SELECT version FROM {MIGRATIONS_TABLE}")}
+
+
+def migrate(engine, migrations=MIGRATIONS):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATIONS_LOCK_ID})")
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL)"
+        )
+        applied = applied_versions(connection)
+        for version, name, statements in migrations:
+            if version in applied:
+                continue
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(
+                f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (%(version)s, %(name)s, %(applied_at)s)",
+                {"version": version, "name": name, "applied_at": datetime.datetime.now()}
+            )
+        return max(applied_versions(connection), default=0)
@@ -148,3 +148,23 @@ def test_auth_user_no_token():
     response = client.get("/user/auth")
     assert response.status_code == 200
     assert response.json() is None
+
+def test_metrics_expose_db_pool():
+    client.post("/user/register", json={"username": "testuser", "password": "testpass", "email": "test@example.com"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    metrics = response.json()
+    assert metrics["db_pool.checked_out"] == 0
+    assert metrics["db_pool.timeouts"] == 0
+    assert metrics["db_pool.wait_count"] > 0
+    assert metrics["db_pool.wait_ms_bucket.le_inf"] == metrics["db_pool.wait_count"]
+    # async mode counts a message as produced only once its delivery report is polled
+    assert metrics["kafka.produced"] + metrics["kafka.queued"] >= 1
+    assert metrics["kafka.failed"] == 0
+
+def test_migrations_are_applied():
+    from migrations import migrate, MIGRATIONS
+    db = UsersDB()
+    assert db.schema_version == MIGRATIONS[-1][0]
+    assert migrate(db.engine) == MIGRATIONS[-1][0]
+
@@ -2,6 +2,7 @@ from fastapi import FastAPI, HTTPException, Cookie, Response
 import uvicorn
 import bcrypt
 import datetime
+import uuid
 
 import schemas
 from database import UsersDB
@@ -24,6 +25,7 @@ def register(user: schemas.UserAuth):
         raise HTTPException(status_code=400, detail=str(e))
     event = {
         "event_type": "user_registered",
+        "event_id": uuid.uuid4().hex,
         "user_id": created_user["id"],
         "username": created_user["username"],
         "email": created_user["email"],
@@ -98,5 +100,16 @@ def auth_user(token: str = Cookie(default=None)):
         return None
     return db_user.id
 
+@app.get("/metrics")
+def metrics():
+    result = db.metrics()
+    for key, value in kafka_producer.stats().items():
+        result[f"kafka.{key}"] = value
+    return result
+
+@app.on_event("shutdown")
+def shutdown():
+    kafka_producer.close()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=5000)
\ No newline at end of file